@@ -7,13 +7,14 @@ import shutil
 import sys
 from pathlib import Path
 
-import yaml
 from link_processor import LinkProcessor
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
 
+from utils.compose_index import DEFAULT_INDEX_PATH  # noqa: E402
 from utils.docker_scanner import DockerComposeScanner  # noqa: E402
 from utils.git_utils import get_git_root  # noqa: E402
+from utils.yaml_io import YAML_BACKEND, YAMLError, safe_load  # noqa: E402
 
 
 class DocsProcessor:
@@ -24,6 +25,7 @@ class DocsProcessor:
         repository_path: Path,
         output_content_path: Path,
         verbose: bool = False,
+        jobs: int = 1,
     ):
         """Initialize the DocsProcessor.
 
@@ -31,6 +33,7 @@ class DocsProcessor:
             repository_path: Path to the repository root
             output_content_path: Path to the output directory for generated content
             verbose: Whether to enable verbose logging
+            jobs: Number of processes parsing compose files
         """
         self.repository_path = repository_path
         self.output_content_path = output_content_path
@@ -42,7 +45,7 @@ class DocsProcessor:
             self.repository_path,
             self.output_content_path,
         )
-        self.docker_scanner = DockerComposeScanner(self.repository_path, self.logger)
+        self.docker_scanner = DockerComposeScanner(self.repository_path, self.logger, DEFAULT_INDEX_PATH, jobs)
 
     def _setup_logging(self, verbose: bool) -> logging.Logger:
         """Configure and return logger instance.
@@ -77,12 +80,12 @@ class DocsProcessor:
         config_path = self.repository_path / "docs" / "web" / "update-docs-config.yaml"
         try:
             with config_path.open() as config_file:
-                data = yaml.safe_load(config_file)
+                data = safe_load(config_file)
                 return data.get("locations", [])
         except FileNotFoundError:
             self.logger.exception(f"Configuration file not found: {config_path}")
             sys.exit(1)
-        except yaml.YAMLError:
+        except YAMLError:
             self.logger.exception(f"Invalid YAML in configuration file: {config_path}")
             sys.exit(1)
 
@@ -348,6 +351,7 @@ class DocsProcessor:
         self._clear_directory(self.output_content_path)
 
         self.logger.info("Processing Docker Compose stacks")
+        self.logger.debug(f"YAML backend: {YAML_BACKEND}")
         source_dir = self.repository_path / "docker"
         target_dir = self.output_content_path / "docker"
         self._process_docker_services(source_dir, target_dir, "docker")
@@ -363,12 +367,13 @@ def main() -> None:
     parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("--repository-path", type=str, help="Path to the repository root")
     parser.add_argument("--output-content-path", type=str, help="Path for generated content output")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of processes parsing compose files (default: 1, parse in this process)")
     args = parser.parse_args()
 
     repository_path = Path(args.repository_path) if args.repository_path else Path(get_git_root())
     output_content_path = Path(args.output_content_path) if args.output_content_path else repository_path / "docs" / "web" / "src" / "content"
 
-    processor = DocsProcessor(repository_path, output_content_path, args.verbose)
+    processor = DocsProcessor(repository_path, output_content_path, args.verbose, max(1, args.jobs))
     processor.process()
 
 
@@ -4,15 +4,29 @@
 they were last changed in git history (oldest first), to help spot stale/un-updated images."""
 
 import argparse
+import csv
+import itertools
+import json
 import logging
+import os
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 
-from utils.compose_processor import ComposeFileProcessor
+from utils.compose_index import DEFAULT_INDEX_PATH
 from utils.docker_scanner import DockerComposeScanner
-from utils.git_utils import get_git_root, get_line_last_changed
+from utils.git_utils import DEFAULT_BLAME_CACHE_PATH, BlameCache, get_git_root
+from utils.image_history import ImageHistoryIndex
+from utils.upstream_tags import DEFAULT_HTTP_CACHE_PATH, UpstreamStatus, UpstreamTagChecker
+
+OUTPUT_FORMATS = ("table", "json", "jsonl", "csv")
+OUTPUT_FIELDS = ("last_changed", "age_days", "category", "stack", "service", "image", "file_path")
+UPSTREAM_FIELDS = ("latest_tag", "versions_behind", "upstream_error")
+# Entries checked against their registries at a time, so streamed output (jsonl, csv, table) starts before all are checked
+UPSTREAM_BATCH_SIZE = 50
 
 
 @dataclass
@@ -25,6 +39,7 @@ class ImageEntry:
     image: str
     file_path: str
     last_changed: datetime | None
+    upstream: UpstreamStatus | None = None
 
     @property
     def label(self) -> str:
@@ -33,6 +48,26 @@ class ImageEntry:
         base = f"{self.category}/{self.stack}"
         return base if self.service == self.stack else f"{base} ({self.service})"
 
+    def to_dict(self) -> dict[str, str | int | None]:
+        """Machine readable representation, with the OUTPUT_FIELDS keys (last_changed in ISO 8601, None if uncommitted),
+        and the UPSTREAM_FIELDS keys if the entry was checked upstream."""
+        data = {
+            "last_changed": self.last_changed.isoformat() if self.last_changed else None,
+            "age_days": get_age_days(self.last_changed),
+            "category": self.category,
+            "stack": self.stack,
+            "service": self.service,
+            "image": self.image,
+            "file_path": self.file_path,
+        }
+        if self.upstream is not None:
+            data |= {
+                "latest_tag": self.upstream.latest_tag,
+                "versions_behind": self.upstream.versions_behind,
+                "upstream_error": self.upstream.error,
+            }
+        return data
+
 
 def configure_logger() -> logging.Logger:
     """Configure and return a logger for warnings encountered while scanning compose files.
@@ -52,46 +87,50 @@ def configure_logger() -> logging.Logger:
     return logger
 
 
-def collect_image_entries(
-    repository_path: Path,
+def iter_image_entries(
+    scanner: DockerComposeScanner,
     docker_path: str,
-    logger: logging.Logger,
-) -> list[ImageEntry]:
-    """Scan all compose files and collect their image references with last-changed dates.
+    line_dates: BlameCache | ImageHistoryIndex,
+    git_jobs: int = 1,
+) -> Iterator[ImageEntry]:
+    """Scan all compose files and yield their image references with last-changed dates as they are computed.
+
+    The last-changed dates of the compose files are looked up concurrently (mostly waiting on git processes),
+    the entries are yielded in scan order regardless of the number of workers.
 
     Args:
-        repository_path: Path to the repository root
+        scanner: Scanner collecting the compose file data
         docker_path: Relative path to docker directory from repository root
-        logger: Logger instance for logging messages
+        line_dates: Source of the last-changed dates of lines (git blame or the image history index)
+        git_jobs: Number of compose files looked up concurrently
 
-    Returns:
-        List of ImageEntry, one per service that declares an image
+    Yields:
+        ImageEntry, one per service that declares an image
     """
-    scanner = DockerComposeScanner(repository_path, logger)
-    compose_processor = ComposeFileProcessor(logger)
+    services = [service for service in scanner.scan_docker_directory(docker_path) if service["image_references"]]
 
-    docker_dir = repository_path / docker_path
-    entries = []
-
-    for service in scanner.scan_docker_directory(docker_path):
-        compose_file = docker_dir / service["file_path"]
+    def get_last_changed(service: dict) -> dict[int, datetime | None]:
         repo_relative_path = f"{docker_path}/{service['file_path']}"
-        stack_name = Path(service["file_path"]).parent.name
+        return line_dates.get_lines_last_changed(repo_relative_path, [reference["line"] for reference in service["image_references"]])
+
+    executor = ThreadPoolExecutor(max_workers=git_jobs)
+    try:
+        for service, last_changed in zip(services, executor.map(get_last_changed, services), strict=True):
+            repo_relative_path = f"{docker_path}/{service['file_path']}"
+            stack_name = Path(service["file_path"]).parent.name
 
-        for reference in compose_processor.extract_image_references(compose_file):
-            last_changed = get_line_last_changed(repository_path, repo_relative_path, reference["line"])
-            entries.append(
-                ImageEntry(
+            for reference in service["image_references"]:
+                yield ImageEntry(
                     category=service["category"] or "root",
                     stack=stack_name,
                     service=reference["service"],
                     image=reference["image"],
                     file_path=repo_relative_path,
-                    last_changed=last_changed,
+                    last_changed=last_changed[reference["line"]],
                 )
-            )
-
-    return entries
+    finally:
+        # Stop the pending lookups if the consumer stopped early (e.g. --limit)
+        executor.shutdown(cancel_futures=True)
 
 
 def get_age_days(last_changed: datetime | None) -> int:
@@ -116,30 +155,108 @@ def format_age(last_changed: datetime | None) -> str:
     return f"{get_age_days(last_changed)}d ago"
 
 
-def print_report(entries: list[ImageEntry], limit: int | None, min_age_days: int | None) -> None:
-    """Print a human readable report of image entries, oldest first.
+def format_upstream(upstream: UpstreamStatus) -> tuple[str, str]:
+    """Format the upstream status of an image for the table report.
+
+    Args:
+        upstream: The upstream status
+
+    Returns:
+        Tuple of (latest tag, versions behind): "?" if the check failed, "-" if the tag is not a version
+    """
+    if upstream.error:
+        return "?", "?"
+    if upstream.latest_tag is None:
+        return "-", "-"
+    return upstream.latest_tag, str(upstream.versions_behind)
+
+
+def select_entries(entries: Iterable[ImageEntry], limit: int | None, min_age_days: int | None, sort: bool = True) -> Iterable[ImageEntry]:
+    """Sort and filter image entries for the report.
+
+    Without sorting, entries are filtered lazily, so they can be printed as they are computed.
 
     Args:
-        entries: List of image entries to report
-        limit: Maximum number of rows to print, or None for no limit
+        entries: Image entries to report
+        limit: Maximum number of entries, or None for no limit
         min_age_days: Only include entries at least this many days old, or None for no filter
+        sort: Order the entries oldest first (otherwise keep the scan order)
+
+    Returns:
+        The selected entries
     """
-    # Uncommitted entries (last_changed is None) are treated as "just now" - newest, printed last
-    entries = sorted(entries, key=lambda e: e.last_changed or datetime.now(tz=UTC))
+    if sort:
+        # Uncommitted entries (last_changed is None) are treated as "just now" - newest, printed last
+        entries = sorted(entries, key=lambda e: e.last_changed or datetime.now(tz=UTC))
 
     if min_age_days is not None:
-        entries = [e for e in entries if get_age_days(e.last_changed) >= min_age_days]
+        entries = (e for e in entries if get_age_days(e.last_changed) >= min_age_days)
 
     if limit is not None:
-        entries = entries[:limit]
+        entries = itertools.islice(entries, limit)
+
+    return entries
+
+
+def check_upstream(entries: Iterable[ImageEntry], checker: UpstreamTagChecker) -> Iterator[ImageEntry]:
+    """Look up the newest compatible tags of the entries' images in their registries.
+
+    The entries are checked in batches of UPSTREAM_BATCH_SIZE, the registries of each batch queried concurrently.
 
-    print(f"{'LAST CHANGED':<12} {'AGE':<12} {'SERVICE':<45} {'IMAGE':<60}")
-    print("-" * 129)
+    Args:
+        entries: Image entries to check
+        checker: Checker querying the registries
+
+    Yields:
+        The entries, in the same order, with their upstream status set
+    """
+    for batch in itertools.batched(entries, UPSTREAM_BATCH_SIZE, strict=False):
+        statuses = checker.check_all(entry.image for entry in batch)
+        for entry in batch:
+            entry.upstream = statuses[entry.image]
+            yield entry
+
+
+def print_report(entries: Iterable[ImageEntry], output_format: str = "table", upstream: bool = False) -> None:
+    """Print a report of image entries, each entry printed as soon as it is available (except for json).
+
+    Args:
+        entries: Image entries to report, see select_entries
+        output_format: One of OUTPUT_FORMATS: human readable table, JSON array, JSON lines or CSV with a header row
+        upstream: Include the upstream status of the entries (see check_upstream)
+    """
+    if output_format == "json":
+        json.dump([entry.to_dict() for entry in entries], sys.stdout, indent=2)
+        print()
+        return
+
+    if output_format == "jsonl":
+        for entry in entries:
+            print(json.dumps(entry.to_dict()), flush=True)
+        return
+
+    if output_format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=OUTPUT_FIELDS + UPSTREAM_FIELDS if upstream else OUTPUT_FIELDS)
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(entry.to_dict())
+        return
+
+    if upstream:
+        print(f"{'LAST CHANGED':<12} {'AGE':<12} {'SERVICE':<45} {'IMAGE':<60} {'LATEST':<25} {'BEHIND':<6}")
+        print("-" * 162)
+    else:
+        print(f"{'LAST CHANGED':<12} {'AGE':<12} {'SERVICE':<45} {'IMAGE':<60}")
+        print("-" * 129)
 
     for entry in entries:
         date_str = entry.last_changed.strftime("%Y-%m-%d") if entry.last_changed else "-"
         age_str = format_age(entry.last_changed)
-        print(f"{date_str:<12} {age_str:<12} {entry.label:<45} {entry.image:<60}")
+        line = f"{date_str:<12} {age_str:<12} {entry.label:<45} {entry.image:<60}"
+        if upstream and entry.upstream is not None:
+            latest_tag, versions_behind = format_upstream(entry.upstream)
+            line = f"{line} {latest_tag:<25} {versions_behind:<6}"
+        print(line)
 
 
 def main() -> None:
@@ -149,17 +266,60 @@ def main() -> None:
     parser.add_argument("--docker-path", type=str, default="docker", help="Relative path to docker directory (default: docker)")
     parser.add_argument("--limit", type=int, help="Maximum number of rows to print (default: no limit)")
     parser.add_argument("--min-age-days", type=int, help="Only show images last changed at least this many days ago (hides recently updated images)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="table", help="Output format (default: table)")
+    parser.add_argument(
+        "--unsorted",
+        action="store_true",
+        help="Keep the scan order instead of oldest first, printing entries as they are computed (e.g. with --format jsonl)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse all compose files, blame all image lines and query all registries, ignoring the compose index, blame cache and HTTP cache",
+    )
+    parser.add_argument(
+        "--history-index",
+        action="store_true",
+        help="Date image lines from a single pass over the git history instead of git blame (faster without a warm blame cache)",
+    )
+    parser.add_argument(
+        "--upstream",
+        action="store_true",
+        help="Query the registries for the newest tag of each image in the same format as the pinned one, and how many versions behind it is",
+    )
+    parser.add_argument("--upstream-jobs", type=int, default=8, help="Number of registry queries run concurrently with --upstream (default: 8)")
+    parser.add_argument("--git-jobs", type=int, default=8, help="Number of compose files blamed concurrently (default: 8)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of processes parsing compose files (default: 1, parse in this process)")
     args = parser.parse_args()
 
     logger = configure_logger()
 
+    line_dates: ImageHistoryIndex | BlameCache | None = None
     try:
         repository_path = args.repository_path or Path(get_git_root())
-        entries = collect_image_entries(repository_path, args.docker_path, logger)
-        print_report(entries, args.limit, args.min_age_days)
+        scanner = DockerComposeScanner(repository_path, logger, None if args.no_cache else DEFAULT_INDEX_PATH, max(1, args.jobs))
+        if args.history_index:
+            line_dates = ImageHistoryIndex(repository_path, args.docker_path, logger)
+            line_dates.build()
+        else:
+            line_dates = BlameCache(repository_path, None if args.no_cache else DEFAULT_BLAME_CACHE_PATH, logger)
+
+        entries = iter_image_entries(scanner, args.docker_path, line_dates, max(1, args.git_jobs))
+        entries = select_entries(entries, args.limit, args.min_age_days, sort=not args.unsorted)
+        if args.upstream:
+            checker = UpstreamTagChecker(None if args.no_cache else repository_path / DEFAULT_HTTP_CACHE_PATH, max(1, args.upstream_jobs), logger)
+            entries = check_upstream(entries, checker)
+        print_report(entries, args.format, args.upstream)
+    except BrokenPipeError:
+        # Output closed by the consumer (e.g. piped into head): avoid another error when Python flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     except Exception:
         logging.exception("Error generating stale image report")
         sys.exit(1)
+    finally:
+        # Also keep the dates looked up when the report was cut short (e.g. piped into head)
+        if isinstance(line_dates, BlameCache):
+            line_dates.save()
 
 
 if __name__ == "__main__":
@@ -9,28 +9,10 @@ import sys
 from pathlib import Path
 from typing import Any
 
-import yaml
-
+from utils.compose_index import DEFAULT_INDEX_PATH
 from utils.docker_scanner import DockerComposeScanner
 from utils.git_utils import get_git_root
-
-
-def str_presenter(dumper: yaml.Dumper, data: str) -> yaml.ScalarNode:
-    """Configure YAML string representation to use block style for multiline strings.
-
-    Args:
-        dumper: YAML dumper instance
-        data: String data to represent
-
-    Returns:
-        YAML scalar node with appropriate style
-    """
-    if "\n" in data:
-        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
-    return dumper.represent_scalar("tag:yaml.org,2002:str", data)
-
-
-yaml.add_representer(str, str_presenter)
+from utils.yaml_io import YAML_BACKEND, dump
 
 
 def configure_logger(verbose: bool) -> logging.Logger:
@@ -89,7 +71,7 @@ def write_yaml(data: dict[str, Any], output_stream: Any) -> None:
         data: Data to write
         output_stream: File stream or stdout
     """
-    yaml.dump(
+    dump(
         data,
         output_stream,
         width=math.inf,
@@ -97,28 +79,25 @@ def write_yaml(data: dict[str, Any], output_stream: Any) -> None:
         sort_keys=False,
         allow_unicode=True,
         indent=2,
-        Dumper=yaml.Dumper,
     )
 
 
 def export_services(
-    repository_path: Path,
+    scanner: DockerComposeScanner,
     output_file: Path | None,
-    docker_path: str = "docker",
-    verbose: bool = False,
+    docker_path: str,
+    logger: logging.Logger,
 ) -> None:
     """Export all Docker Compose services to a YAML file or stdout.
 
     Args:
-        repository_path: Path to the repository root
+        scanner: Scanner collecting the compose file data
         output_file: Path to the output YAML file, or None for stdout
-        docker_path: Relative path to docker directory (default: "docker")
-        verbose: Enable verbose logging
+        docker_path: Relative path to docker directory
+        logger: Logger instance for logging messages
     """
-    logger = configure_logger(verbose)
-
     logger.info(f"Scanning Docker Compose files in {docker_path}")
-    scanner = DockerComposeScanner(repository_path, logger)
+    logger.debug(f"YAML parser: {YAML_BACKEND}")
     services = scanner.scan_docker_directory(docker_path)
 
     output_data = {"services": [build_service_data(service) for service in services]}
@@ -158,12 +137,26 @@ def main() -> None:
         default="docker",
         help="Relative path to docker directory (default: docker)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse all compose files, ignoring the compose index",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes parsing compose files (default: 1, parse in this process)",
+    )
     args = parser.parse_args()
 
+    logger = configure_logger(args.verbose)
     repository_path = args.repository_path or Path(get_git_root())
+    scanner = DockerComposeScanner(repository_path, logger, None if args.no_cache else DEFAULT_INDEX_PATH, max(1, args.jobs))
 
     try:
-        export_services(repository_path, args.output_file, args.docker_path, args.verbose)
+        export_services(scanner, args.output_file, args.docker_path, logger)
     except Exception:
         logging.exception("Error exporting services")
         sys.exit(1)
@@ -4,16 +4,15 @@ FastMCP server implementation for task runner integration, container operations,
 Dynamically creates tools from the output of 'task --list-all'.
 """
 
-import contextlib
-import io
 import logging
 import os
 import signal
 import sys
+from typing import Literal
 
 from fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 
 from tools.collections.container_tools import add_container_operation_tools
 from tools.collections.task_tools import add_task_tools
@@ -23,6 +22,7 @@ from tools.get_container_tags import ContainerTagFinder
 from tools.get_dashboard_groups import DashboardGroupFinder
 from utils.constants import DEFAULT_CONTAINER_ARCHITECTURE, DEFAULT_SAME_HASH_LIMIT, DEFAULT_TAG_LIMIT
 from utils.git import get_git_root
+from utils.http import get_session
 from utils.models import ContainerTagFinderArgs
 from utils.security import validate_url_for_ssrf
 
@@ -47,6 +47,12 @@ async def health_check(_request: Request) -> PlainTextResponse:
     return PlainTextResponse("OK")
 
 
+@mcp.custom_route("/stats/http", methods=["GET"])
+async def http_stats(_request: Request) -> JSONResponse:
+    """Connection reuse statistics of the shared HTTP session, per host."""
+    return JSONResponse(get_session().get_connection_stats())
+
+
 @mcp.tool(name="get-app-icon")
 def get_app_icon(app_name: str, homepage_url: str) -> str:
     """
@@ -104,18 +110,21 @@ def get_container_categories() -> list[str]:
 
 
 @mcp.tool(name="list-container-tags")
-def list_container_tags(image: str, limit: int = DEFAULT_TAG_LIMIT) -> list[str]:
+def list_container_tags(image: str, limit: int = DEFAULT_TAG_LIMIT, sort: Literal["updated", "version", "default"] = "updated") -> list[str]:
     """
     List recent tags for a container image.
 
     Args:
         image: Image name (e.g., nginx or registry.example.com/nginx)
         limit: Maximum number of tags to display (default: 10)
+        sort: Order of the tags: 'updated' (most recently updated first, default), 'version' (highest version first),
+            or 'default' (registry order)
 
     Returns:
-        list[str]: A list of tag names sorted by recency
+        list[str]: A list of tag names sorted as requested
     """
     tag_finder = ContainerTagFinder()
+    limit = max(limit, 1)
     try:
         args = ContainerTagFinderArgs(
             image=image,
@@ -123,10 +132,11 @@ def list_container_tags(image: str, limit: int = DEFAULT_TAG_LIMIT) -> list[str]
             limit=limit,
             quiet=True,
             registry=None,
+            sort=sort,
         )
 
-        tags, _, _, _ = tag_finder.get_image_tags(args)
-        return [tag["name"] for tag in tags[:limit]] if tags else []
+        analysis = tag_finder.analyze_tags(args, limit=limit)
+        return [tag["name"] for tag in analysis.tags[:limit]]
     except Exception:
         logger.exception(f"list-container-tags failed for image={image!r}")
         return []
@@ -156,9 +166,8 @@ def list_same_hash_container_tags(image: str, tag: str | None = None, limit: int
             registry=None,
         )
 
-        # Get same hash tags but don't output to stdout
-        same_hash_tags = tag_finder.list_same_hash_tags(args, suppress_output=True)
-        return [tag["name"] for tag in same_hash_tags] if same_hash_tags else []
+        analysis = tag_finder.analyze_tags(args)
+        return [tag["name"] for tag in analysis.same_digest_tags]
     except Exception:
         logger.exception(f"list-same-hash-container-tags failed for image={image!r} tag={tag!r}")
         return []
@@ -188,18 +197,16 @@ def get_most_specific_container_tag(image: str, tag: str | None = None, limit: i
             registry=None,
         )
 
-        # Suppress any prints from the finder
-        with contextlib.redirect_stdout(io.StringIO()):
-            most_specific = tag_finder.get_most_specific_tag(args)
-            same_hash = tag_finder.list_same_hash_tags(args, suppress_output=True)
+        # A single tag retrieval for both the same-digest group and the specificity ranking
+        analysis = tag_finder.analyze_tags(args)
     except Exception:
         logger.exception(f"get-most-specific-container-tag failed for image={image!r} tag={tag!r}")
         return tag or "latest"
     else:
-        if most_specific:
-            return most_specific["name"]
-        if same_hash:
-            return same_hash[0]["name"]
+        if analysis.most_specific_tag:
+            return analysis.most_specific_tag["name"]
+        if analysis.same_digest_tags:
+            return analysis.same_digest_tags[0]["name"]
         return tag or "latest"
 
 
@@ -215,6 +222,9 @@ def handle_shutdown(signum: int, _frame: object) -> None:
     """
     signal_name = signal.Signals(signum).name
     logger.info(f"Received {signal_name}, shutting down gracefully...")
+    for host, stats in get_session().get_connection_stats().items():
+        logger.info(f"HTTP {host}: {stats['requests']} requests, {stats['connections']} connections ({stats['reused']} reused)")
+    logger.info(f"HTTP cache: {get_session().cache.format_stats()}")
     sys.exit(0)
 
 
@@ -8,12 +8,17 @@ from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 
-# Import constants from the shared constants module
+# Use relative import for package structure
 try:
     from ..utils.constants import DEFAULT_REQUEST_TIMEOUT
+    from ..utils.http import get_session
 except ImportError:
-    # Fallback for standalone execution
-    DEFAULT_REQUEST_TIMEOUT = 10
+    # When run as standalone script, adjust path
+    import os
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from utils.constants import DEFAULT_REQUEST_TIMEOUT
+    from utils.http import get_session
 
 
 class AppIconFinder:
@@ -22,10 +27,14 @@ class AppIconFinder:
     or by extracting favicons from an application's homepage.
     """
 
-    def __init__(self):
+    def __init__(self, session: requests.Session | None = None):
         """
         Initialize the AppIconFinder with default headers for HTTP requests.
+
+        Args:
+            session: HTTP session used for all requests. If None, the session shared by all tools is used.
         """
+        self.session = session or get_session()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
@@ -68,7 +77,7 @@ class AppIconFinder:
         icon_name = f"{normalized_name}.png"
         url = f"https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/png/{icon_name}"
         try:
-            response = requests.head(
+            response = self.session.head(
                 url,
                 headers=self.headers,
                 timeout=DEFAULT_REQUEST_TIMEOUT,
@@ -79,7 +88,7 @@ class AppIconFinder:
             # Some CDNs/origins may disallow HEAD or require GET.
             if response.status_code in (403, 405):
                 # Use GET fallback for servers that disallow HEAD; ensure connection is closed.
-                with requests.get(url, headers=self.headers, timeout=DEFAULT_REQUEST_TIMEOUT) as probe:
+                with self.session.get(url, headers=self.headers, timeout=DEFAULT_REQUEST_TIMEOUT) as probe:
                     if probe.ok:
                         return icon_name
         except requests.RequestException:
@@ -131,7 +140,7 @@ class AppIconFinder:
         """
         default_favicon = urljoin(homepage_url, "/favicon.ico")
         try:
-            favicon_response = requests.head(
+            favicon_response = self.session.head(
                 default_favicon,
                 headers=self.headers,
                 timeout=5,
@@ -162,7 +171,7 @@ class AppIconFinder:
                 homepage_url = f"https://{homepage_url}"
 
             # Fetch the homepage
-            response = requests.get(homepage_url, headers=self.headers, timeout=DEFAULT_REQUEST_TIMEOUT)
+            response = self.session.get(homepage_url, headers=self.headers, timeout=DEFAULT_REQUEST_TIMEOUT)
             response.raise_for_status()
 
             # Parse the HTML
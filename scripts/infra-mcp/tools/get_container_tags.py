@@ -1,21 +1,59 @@
 #!/usr/bin/env python3
 
 import argparse
+import logging
 import platform
+import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 from typing import Any
+from urllib.parse import urlencode, urljoin
 
 import requests
 
-# Import constants from the shared constants module
+# Use relative import for package structure
 try:
-    from ..utils.constants import MAX_TAGS_FETCH_LIMIT, REGISTRY_REQUEST_TIMEOUT
+    from ..utils.constants import (
+        DOCKER_HUB_PAGE_SIZE,
+        MANIFEST_FETCH_WORKERS,
+        MAX_REGISTRY_CONCURRENT_REQUESTS,
+        MAX_TAGS_FETCH_LIMIT,
+        REGISTRY_REQUEST_TIMEOUT,
+    )
+    from ..utils.http import get_session
+    from ..utils.models import TagAnalysis
 except ImportError:
-    # Fallback for standalone execution
-    REGISTRY_REQUEST_TIMEOUT = 30
-    MAX_TAGS_FETCH_LIMIT = 1000
+    # When run as standalone script, adjust path
+    import os
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from utils.constants import (
+        DOCKER_HUB_PAGE_SIZE,
+        MANIFEST_FETCH_WORKERS,
+        MAX_REGISTRY_CONCURRENT_REQUESTS,
+        MAX_TAGS_FETCH_LIMIT,
+        REGISTRY_REQUEST_TIMEOUT,
+    )
+    from utils.http import get_session
+    from utils.models import TagAnalysis
+
+logger = logging.getLogger("infra-mcp")
+
+# Version tag: optional "v" prefix, dot-separated numbers, optional suffix (e.g. "v1.2.3", "18.1-bookworm")
+_VERSION_TAG_PATTERN = re.compile(r"^(v?)(\d+(?:\.\d+)*)(.*)$", re.IGNORECASE)
+# Parameters of a WWW-Authenticate challenge: key="value"
+_AUTH_PARAM_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+# Repository part of a registry API v2 URL: <registry>/v2/<name>
+_REGISTRY_REPOSITORY_PATTERN = re.compile(r"^(.+/v2/.+?)/(?:tags|manifests|blobs)/")
+
+# Limits of concurrent manifest requests per registry URL, shared by all finders of the process
+_registry_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_registry_semaphores_lock = threading.Lock()
 
 _arch_map = {"x86_64": "amd64", "aarch64": "arm64", "armv7l": "arm"}
 
@@ -25,16 +63,77 @@ def _default_architecture() -> str:
     return f"linux/{arch}"
 
 
+def _get_registry_semaphore(registry_url: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting the concurrent manifest requests to a registry."""
+    with _registry_semaphores_lock:
+        if registry_url not in _registry_semaphores:
+            _registry_semaphores[registry_url] = threading.BoundedSemaphore(MAX_REGISTRY_CONCURRENT_REQUESTS)
+        return _registry_semaphores[registry_url]
+
+
+@dataclass
+class _DockerHubQuery:
+    """Plan of a Docker Hub tag listing: server-side ordering, page size and when to stop paginating."""
+
+    ordering: str | None
+    page_size: int
+    max_tags: int
+    # Exact tag lookup: filter tag names and stop at the page with this tag
+    tag_name: str | None = None
+
+    @property
+    def params(self) -> dict[str, str | int]:
+        """Query parameters of the first page (next pages are linked by Docker Hub)."""
+        params: dict[str, str | int] = {"page_size": self.page_size}
+        if self.ordering:
+            params["ordering"] = self.ordering
+        if self.tag_name:
+            params["name"] = self.tag_name
+        return params
+
+
+def _plan_docker_hub_query(sort_by: str, limit: int | None, tag_name: str | None = None) -> _DockerHubQuery:
+    """Map a tag listing request onto Docker Hub's server-side ordering and page sizes, fetching as few pages as possible.
+
+    - 'updated': Docker Hub orders by last update, the first `limit` tags are the result
+    - 'default': Docker Hub order, the first `limit` tags are the result
+    - 'version': versions are sorted locally, all tags (up to MAX_TAGS_FETCH_LIMIT) are needed
+    - exact tag lookup (tag_name): names are filtered by Docker Hub (substring match), pagination stops at the
+      page containing the tag
+
+    Args:
+        sort_by: Sort method - 'version', 'updated', or 'default'
+        limit: Maximum number of tags needed, None (or not positive) for all tags
+        tag_name: Tag to look up, instead of listing tags
+
+    Returns:
+        _DockerHubQuery: The query plan
+    """
+    max_tags = min(limit, MAX_TAGS_FETCH_LIMIT) if limit is not None and limit > 0 else MAX_TAGS_FETCH_LIMIT
+    if tag_name is not None:
+        return _DockerHubQuery(None, DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT, tag_name)
+    if sort_by == "updated":
+        return _DockerHubQuery("last_updated", min(max_tags, DOCKER_HUB_PAGE_SIZE), max_tags)
+    if sort_by == "default":
+        return _DockerHubQuery(None, min(max_tags, DOCKER_HUB_PAGE_SIZE), max_tags)
+    return _DockerHubQuery(None, DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT)
+
+
 class ContainerTagFinder:
     """
     A class for finding and analyzing container image tags from Docker Hub or private registries.
     """
 
-    def __init__(self):
+    def __init__(self, session: requests.Session | None = None):
         """
         Initialize the ContainerTagFinder.
+
+        Args:
+            session: HTTP session used for all requests. If None, the session shared by all tools is used.
         """
-        pass
+        self.session = session or get_session()
+        self._registry_tokens: dict[str, str] = {}
+        self._registry_tokens_lock = threading.Lock()
 
     def _parse_arch(self, arch: str) -> tuple[str, str]:
         """
@@ -210,7 +309,8 @@ class ContainerTagFinder:
 
         Args:
             image_name: Name of the image to query
-            limit: Maximum number of tags to return (unused in fetching, used by caller)
+            limit: Maximum number of tags to return. Only the needed pages are fetched when Docker Hub can sort
+                the tags ('updated' and 'default'), version sorting needs all tags (see _plan_docker_hub_query).
             architecture: Architecture to filter by (e.g., 'linux/amd64')
             sort_by: Sort method - 'version' (default), 'updated', or 'default' (Docker Hub order)
 
@@ -220,6 +320,31 @@ class ContainerTagFinder:
         if architecture is None:
             architecture = _default_architecture()
 
+        try:
+            tag_data = self._query_docker_hub(image_name, _plan_docker_hub_query(sort_by, limit), architecture)
+
+            # Sort based on sort_by parameter
+            self._sort_tags(tag_data, sort_by)
+        except requests.exceptions.RequestException as e:
+            print(f"Error querying Docker Hub: {e}", file=sys.stderr)
+            return []
+        else:
+            return tag_data
+
+    def _query_docker_hub(self, image_name: str, query: _DockerHubQuery, architecture: str) -> list[dict[str, Any]]:
+        """Fetch the pages of a Docker Hub tag listing until the query is satisfied.
+
+        Args:
+            image_name: Name of the image to query
+            query: The query plan (see _plan_docker_hub_query)
+            architecture: Architecture to get digests for (e.g., 'linux/amd64')
+
+        Returns:
+            list: Tag dictionaries in Docker Hub order, at most query.max_tags
+
+        Raises:
+            requests.exceptions.RequestException: If Docker Hub cannot be queried
+        """
         # Parse repository name
         if "/" in image_name:
             namespace, repo = image_name.split("/", 1)
@@ -227,32 +352,114 @@ class ContainerTagFinder:
             namespace = "library"  # Official images are in the 'library' namespace
             repo = image_name
 
-        url: str = f"https://hub.docker.com/v2/repositories/{namespace}/{repo}/tags?page_size=100"
-        try:
-            response = requests.get(url, timeout=30)
+        url: str | None = f"https://hub.docker.com/v2/repositories/{namespace}/{repo}/tags?{urlencode(query.params)}"
+        tag_data: list[dict[str, Any]] = []
+        # Handle pagination while more tags are needed
+        while url and len(tag_data) < query.max_tags:
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             data = response.json()
-            tag_data: list[dict[str, Any]] = []
 
-            for tag in data.get("results", []):
-                tag_data.append(self._create_tag_data_dict(tag, architecture))
+            page = [self._create_tag_data_dict(tag, architecture) for tag in data.get("results", [])]
+            tag_data.extend(page)
+            if query.tag_name is not None and any(tag["name"] == query.tag_name for tag in page):
+                # Exact tag lookup: the tag was found
+                break
+            url = data.get("next")
 
-            # Handle pagination if there are more tags
-            while "next" in data and data["next"] and len(tag_data) < 1000:  # Limit to avoid too many requests
-                response = requests.get(data["next"], timeout=30)
-                response.raise_for_status()
-                data = response.json()
+        return tag_data[: query.max_tags]
 
-                for tag in data.get("results", []):
-                    tag_data.append(self._create_tag_data_dict(tag, architecture))
+    def find_tag(self, image: str, tag_name: str, architecture: str | None = None, registry: str | None = None) -> dict[str, Any] | None:
+        """Look up a single tag of an image, without listing all tags.
 
-            # Sort based on sort_by parameter
-            self._sort_tags(tag_data, sort_by)
+        Args:
+            image: Image name without tag (e.g., 'nginx' or 'ghcr.io/owner/app')
+            tag_name: The tag to look up
+            architecture: Architecture to get the digest for (e.g., 'linux/amd64')
+            registry: Optional registry URL override
+
+        Returns:
+            dict: The tag data, or None if the tag was not found or the registry could not be queried
+        """
+        if architecture is None:
+            architecture = _default_architecture()
+
+        registry_url, image_name, is_docker_hub = self._parse_image_reference(image, registry)
+        if not is_docker_hub:
+            tag_info = self._fetch_manifest_for_tag(registry_url, image_name, tag_name, architecture)
+            return tag_info if tag_info["digest"] else None
+
+        try:
+            tags = self._query_docker_hub(image_name, _plan_docker_hub_query("default", None, tag_name), architecture)
         except requests.exceptions.RequestException as e:
             print(f"Error querying Docker Hub: {e}", file=sys.stderr)
-            return []
-        else:
-            return tag_data
+            return None
+        return next((tag for tag in tags if tag["name"] == tag_name), None)
+
+    def _registry_get(self, url: str, headers: dict[str, str] | None = None) -> requests.Response:
+        """Send a GET request to a registry API v2, with an anonymous bearer token if the registry requires one.
+
+        Args:
+            url: URL to fetch
+            headers: Additional request headers
+
+        Returns:
+            Response: The registry response (status not checked)
+        """
+        headers = dict(headers or {})
+        # Tokens are scoped to a repository: reuse the token of previous requests (pagination, manifests)
+        repository_match = _REGISTRY_REPOSITORY_PATTERN.match(url)
+        token_key = repository_match.group(1) if repository_match else url
+        with self._registry_tokens_lock:
+            token = self._registry_tokens.get(token_key)
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+
+        response = self.session.get(url, headers=headers, timeout=REGISTRY_REQUEST_TIMEOUT)
+        challenge = response.headers.get("WWW-Authenticate", "")
+        if response.status_code != 401 or not challenge.lower().startswith("bearer "):
+            return response
+
+        params = dict(_AUTH_PARAM_PATTERN.findall(challenge))
+        realm = params.pop("realm", None)
+        if realm is None:
+            return response
+
+        # Tokens are short-lived, never cache them
+        token_response = self.session.get(realm, params=params, headers={"Cache-Control": "no-store"}, timeout=REGISTRY_REQUEST_TIMEOUT)
+        token_response.raise_for_status()
+        token_data = token_response.json()
+        token = token_data.get("token") or token_data.get("access_token")
+        if not token:
+            return response
+        with self._registry_tokens_lock:
+            self._registry_tokens[token_key] = token
+
+        headers["Authorization"] = f"Bearer {token}"
+        return self.session.get(url, headers=headers, timeout=REGISTRY_REQUEST_TIMEOUT)
+
+    def get_registry_tag_names(self, registry_url: str, image_name: str) -> list[str]:
+        """Query a registry API v2 for the tag names of an image, following pagination.
+
+        Args:
+            registry_url: URL of the registry
+            image_name: Name of the image to query
+
+        Returns:
+            list: Tag names in registry order
+
+        Raises:
+            requests.exceptions.RequestException: If the registry cannot be queried
+        """
+        tags: list[str] = []
+        url: str | None = f"{registry_url}/v2/{image_name}/tags/list"
+        while url and len(tags) < MAX_TAGS_FETCH_LIMIT:
+            response = self._registry_get(url)
+            response.raise_for_status()
+            tags.extend(response.json().get("tags") or [])
+            next_url = response.links.get("next", {}).get("url")
+            url = urljoin(url, next_url) if next_url else None
+        return tags
 
     def _fetch_manifest_for_tag(
         self,
@@ -276,7 +483,7 @@ class ContainerTagFinder:
         try:
             # Try to get the manifest to extract creation time
             headers = {"Accept": "application/vnd.docker.distribution.manifest.v2+json"}
-            manifest_response = requests.get(manifest_url, headers=headers, timeout=REGISTRY_REQUEST_TIMEOUT)
+            manifest_response = self._registry_get(manifest_url, headers=headers)
             manifest_response.raise_for_status()
 
             # Get digest from the manifest
@@ -305,6 +512,36 @@ class ContainerTagFinder:
             digest = None
         return {"name": tag, "last_updated": last_modified, "digest": digest}
 
+    def _fetch_manifests(self, registry_url: str, image_name: str, tags: list[str], architecture: str) -> list[dict[str, Any]]:
+        """Fetch manifest information for tags concurrently (see _fetch_manifest_for_tag).
+
+        Requests are limited per call (MANIFEST_FETCH_WORKERS) and per registry across all calls
+        (MAX_REGISTRY_CONCURRENT_REQUESTS).
+
+        Args:
+            registry_url: URL of the registry
+            image_name: Name of the image
+            tags: Tags to fetch manifests for
+            architecture: Architecture to filter by (e.g., 'linux/amd64')
+
+        Returns:
+            list: Tag data of each tag, in the order of tags
+        """
+        if not tags:
+            return []
+
+        semaphore = _get_registry_semaphore(registry_url)
+
+        def fetch(tag: str) -> dict[str, Any]:
+            with semaphore:
+                return self._fetch_manifest_for_tag(registry_url, image_name, tag, architecture)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(MANIFEST_FETCH_WORKERS, len(tags))) as executor:
+            tag_data = list(executor.map(fetch, tags))
+        logger.info(f"Fetched {len(tags)} manifests of {image_name} from {registry_url} in {time.perf_counter() - start:.2f}s")
+        return tag_data
+
     def get_registry_tags(
         self,
         registry_url: str,
@@ -328,19 +565,12 @@ class ContainerTagFinder:
         if architecture is None:
             architecture = _default_architecture()
 
-        url: str = f"{registry_url}/v2/{image_name}/tags/list"
         try:
-            response = requests.get(url, timeout=REGISTRY_REQUEST_TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
-            tags: list[str] = data.get("tags", [])
+            tags = self.get_registry_tag_names(registry_url, image_name)
 
             # For Docker Registry API v2, we need to make additional requests to get manifest and timestamps
-            tag_data: list[dict[str, Any]] = []
             # Limit the number of additional requests
-            for tag in tags[:100]:
-                tag_info = self._fetch_manifest_for_tag(registry_url, image_name, tag, architecture)
-                tag_data.append(tag_info)
+            tag_data = self._fetch_manifests(registry_url, image_name, tags[:100], architecture)
 
             # Sort based on sort_by parameter
             self._sort_tags(tag_data, sort_by)
@@ -475,6 +705,82 @@ class ContainerTagFinder:
             # Use Docker Hub
             return None, image, True
 
+    def get_tags(self, image: str, architecture: str | None = None, sort_by: str = "version", fetch_manifests: bool = True) -> list[dict[str, Any]]:
+        """Get the tags of an image from Docker Hub or from its registry.
+
+        Args:
+            image: Image name without tag (e.g., 'nginx' or 'ghcr.io/owner/app')
+            architecture: Architecture to get digests for (e.g., 'linux/amd64')
+            sort_by: Sort method - 'version' (default), 'updated', or 'default' (registry order)
+            fetch_manifests: For registries other than Docker Hub, fetch the manifest of each tag for its digest and
+                last update time (one request per tag, first 100 tags only). If False, only tag names are returned.
+
+        Returns:
+            list: List of tag dictionaries sorted according to sort_by parameter, empty if the query failed
+        """
+        registry_url, image_name, is_docker_hub = self._parse_image_reference(image)
+        if is_docker_hub:
+            return self.get_docker_hub_tags(image_name, MAX_TAGS_FETCH_LIMIT, architecture, sort_by)
+        if fetch_manifests:
+            return self.get_registry_tags(registry_url, image_name, architecture=architecture, sort_by=sort_by)
+
+        try:
+            tag_data = [{"name": tag, "last_updated": None, "digest": None} for tag in self.get_registry_tag_names(registry_url, image_name)]
+        except requests.exceptions.RequestException as e:
+            print(f"Error querying registry: {e}", file=sys.stderr)
+            return []
+        self._sort_tags(tag_data, sort_by)
+        return tag_data
+
+    def _parse_version_tag(self, tag_name: str) -> tuple[tuple[str, int, str], tuple[int, ...]] | None:
+        """
+        Split a version tag into its variant and its version.
+
+        Unlike _parse_version (used to sort tags), the version takes all leading numbers, e.g. (1, 2, 3)
+        for "1.2.3rc1", and the rest of the tag goes into the suffix.
+
+        The variant is the prefix, the number of version components and the suffix with digits masked:
+        tags of the same variant are versions of the same image flavor, e.g. "1.2.3-alpine3.19" and
+        "1.3.0-alpine3.20", but not "1.3" or "1.3.0-bookworm".
+
+        Args:
+            tag_name: The tag name to parse
+
+        Returns:
+            tuple: A tuple containing (variant, version), or None if not a version tag
+        """
+        match = _VERSION_TAG_PATTERN.match(tag_name)
+        if not match:
+            return None
+        prefix, version, suffix = match.groups()
+        numbers = tuple(int(number) for number in version.split("."))
+        return (prefix.lower(), len(numbers), re.sub(r"\d+", "#", suffix.lower())), numbers
+
+    def get_newer_compatible_tags(self, current_tag: str, tags: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
+        """
+        Find the tags with a newer version than the current tag, in the same variant (see _parse_version_tag).
+
+        Args:
+            current_tag: The tag in use
+            tags: Tags of the image
+
+        Returns:
+            list: The newer compatible tags, newest first (empty if the current tag is the newest one),
+                or None if the current tag is not a version tag (e.g. 'latest')
+        """
+        current = self._parse_version_tag(current_tag)
+        if current is None:
+            return None
+
+        current_variant, current_version = current
+        newer_tags = []
+        for tag in tags:
+            parsed = self._parse_version_tag(tag["name"])
+            if parsed is not None and parsed[0] == current_variant and parsed[1] > current_version:
+                newer_tags.append((parsed[1], tag))
+        newer_tags.sort(key=lambda item: item[0], reverse=True)
+        return [tag for _, tag in newer_tags]
+
     def _get_output_flags(self, args: argparse.Namespace, suppress_output: bool = False) -> tuple[bool, bool]:
         """Get output flag settings from args."""
         quiet = args.quiet if hasattr(args, "quiet") else False
@@ -531,86 +837,116 @@ class ContainerTagFinder:
         elif not quiet:
             print(f"No tags found for {args.image}")
 
-    def list_same_hash_tags(self, args: argparse.Namespace, suppress_output: bool = False) -> list[dict[str, Any]]:
-        """List tags that have the same hash as the specified tag.
+    def analyze_tags(self, args: argparse.Namespace, limit: int = MAX_TAGS_FETCH_LIMIT) -> TagAnalysis:
+        """Retrieve the tags of an image once, and find the tags with the same digest as the reference tag,
+        ranked by specificity.
 
         Args:
-            args: Command line arguments
-            suppress_output: If True, suppress all output regardless of quiet flag
-        """
-        # Get output flags
-        quiet, should_output = self._get_output_flags(args, suppress_output)
+            args: Command line arguments (image, tag, architecture, registry, sort)
+            limit: Maximum number of tags to retrieve
 
-        # Get all tags for the image (use 1000 as limit to get more tags for searching)
-        all_tags, _registry_url, _image_name, _is_docker_hub = self.get_image_tags(args, limit=1000)
+        Returns:
+            TagAnalysis: The retrieved tags and their analysis
+        """
+        all_tags, _registry_url, _image_name, _is_docker_hub = self.get_image_tags(args, limit=limit)
+        analysis = TagAnalysis(tags=all_tags)
 
         if not all_tags:
-            if should_output:
-                print(f"No tags found for {args.image}")
-            return []
+            analysis.error = f"No tags found for {args.image}"
+            return analysis
 
         # Find the target tag to get its digest
-        tag_name = args.tag if args.tag else all_tags[0]["name"]  # Use first tag if none specified
-        target_tag = next((t for t in all_tags if t["name"] == tag_name), None)
-
-        if not target_tag:
-            if should_output:
-                print(f"Tag '{tag_name}' not found for {args.image}")
-            return []
-
-        target_digest = target_tag.get("digest")
+        tag_name = args.tag if getattr(args, "tag", None) else all_tags[0]["name"]  # Use first tag if none specified
+        analysis.reference_tag = next((t for t in all_tags if t["name"] == tag_name), None)
+        if not analysis.reference_tag and getattr(args, "tag", None):
+            # The tag may be older than the retrieved ones
+            analysis.reference_tag = self.find_tag(args.image, tag_name, args.architecture, args.registry)
+            if analysis.reference_tag:
+                all_tags = [analysis.reference_tag, *all_tags]
+
+        if not analysis.reference_tag:
+            analysis.error = f"Tag '{tag_name}' not found for {args.image}"
+            return analysis
+
+        target_digest = analysis.reference_tag.get("digest")
         if not target_digest:
-            if should_output:
-                print(f"No digest found for tag '{tag_name}'")
-            return []
+            analysis.error = f"No digest found for tag '{tag_name}'"
+            return analysis
 
         # Find all tags with the same digest
-        same_hash_tags = self.get_tags_by_digest(all_tags, target_digest)
+        analysis.same_digest_tags = self.get_tags_by_digest(all_tags, target_digest)
+        if not analysis.same_digest_tags:
+            analysis.error = f"No tags found with the same digest as '{tag_name}'"
+            return analysis
+
+        # Calculate the specificity score for each tag, sorted by specificity score (highest first)
+        analysis.ranked_tags = [(tag, self._determine_tag_specificity(tag["name"])) for tag in analysis.same_digest_tags]
+        analysis.ranked_tags.sort(key=lambda x: x[1], reverse=True)
+        return analysis
+
+    def list_same_hash_tags(
+        self, args: argparse.Namespace, suppress_output: bool = False, analysis: TagAnalysis | None = None
+    ) -> list[dict[str, Any]]:
+        """List tags that have the same hash as the specified tag.
 
-        if same_hash_tags:
-            if not suppress_output and quiet:
-                # In quiet mode (but not suppressed), output the tag names, one per line
-                for tag in same_hash_tags:
-                    print(tag["name"])
-            elif should_output:
-                # Detailed output
-                print(f"\nTags with the same digest as '{tag_name}' ({self._format_digest(target_digest)}) for {args.image}:")
-                print(f"{'TAG':<30} {'LAST UPDATED':<30} {'SIZE':<15}")
-                print("-" * 75)
+        Args:
+            args: Command line arguments
+            suppress_output: If True, suppress all output regardless of quiet flag
+            analysis: Analysis of the tags of the image. If None, the tags are retrieved (see analyze_tags).
+        """
+        # Get output flags
+        quiet, should_output = self._get_output_flags(args, suppress_output)
 
-                for tag in same_hash_tags:
-                    updated = self._format_datetime(tag.get("last_updated"))
-                    size = self._format_size(tag.get("size")) if "size" in tag else "N/A"
-                    print(f"{tag['name']:<30} {updated:<30} {size:<15}")
+        if analysis is None:
+            analysis = self.analyze_tags(args)
+
+        same_hash_tags = analysis.same_digest_tags
+        if not same_hash_tags:
+            if should_output and analysis.error:
+                print(analysis.error)
+            return []
+
+        if not suppress_output and quiet:
+            # In quiet mode (but not suppressed), output the tag names, one per line
+            for tag in same_hash_tags:
+                print(tag["name"])
         elif should_output:
-            print(f"No tags found with the same digest as '{tag_name}'")
+            # Detailed output
+            tag_name = analysis.reference_tag["name"]
+            target_digest = analysis.reference_tag.get("digest")
+            print(f"\nTags with the same digest as '{tag_name}' ({self._format_digest(target_digest)}) for {args.image}:")
+            print(f"{'TAG':<30} {'LAST UPDATED':<30} {'SIZE':<15}")
+            print("-" * 75)
+
+            for tag in same_hash_tags:
+                updated = self._format_datetime(tag.get("last_updated"))
+                size = self._format_size(tag.get("size")) if "size" in tag else "N/A"
+                print(f"{tag['name']:<30} {updated:<30} {size:<15}")
 
         return same_hash_tags
 
-    def get_most_specific_tag(self, args: argparse.Namespace) -> dict[str, Any] | None:
-        """Find the most specific version tag from a set of tags with the same hash."""
+    def get_most_specific_tag(self, args: argparse.Namespace, analysis: TagAnalysis | None = None) -> dict[str, Any] | None:
+        """Find the most specific version tag from a set of tags with the same hash.
+
+        Args:
+            args: Command line arguments
+            analysis: Analysis of the tags of the image. If None, the tags are retrieved (see analyze_tags).
+        """
         # Store quiet flag to local variable for easier access
         quiet = args.quiet if hasattr(args, "quiet") else False
 
-        # First, get all tags with the same hash
+        if analysis is None:
+            analysis = self.analyze_tags(args)
+
+        # First, list all tags with the same hash
         # When in quiet mode, suppress output from list_same_hash_tags
-        same_hash_tags = self.list_same_hash_tags(args, suppress_output=quiet)
+        self.list_same_hash_tags(args, suppress_output=quiet, analysis=analysis)
 
-        if not same_hash_tags or len(same_hash_tags) < 2:
-            # No need to find most specific if there's only one tag
+        # No need to find most specific if there's only one tag
+        most_specific = analysis.most_specific_tag
+        if most_specific is None:
             return None
-
-        # Calculate the specificity score for each tag
-        tag_scores: list[tuple[dict[str, Any], int]] = []
-        for tag in same_hash_tags:
-            score = self._determine_tag_specificity(tag["name"])
-            tag_scores.append((tag, score))
-
-        # Sort by specificity score (highest first)
-        tag_scores.sort(key=lambda x: x[1], reverse=True)
-
-        # Get the most specific tag
-        most_specific: dict[str, Any] = tag_scores[0][0]
+        tag_scores = analysis.ranked_tags
 
         if quiet:
             # Only output the final recommended tag
@@ -8,12 +8,14 @@ import yaml
 # Use relative import for package structure
 try:
     from ..utils.git import get_git_root
+    from ..utils.yaml_io import safe_load
 except ImportError:
     # When run as standalone script, adjust path
     import os
 
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
     from utils.git import get_git_root
+    from utils.yaml_io import safe_load
 
 
 class DashboardGroupFinder:
@@ -42,7 +44,7 @@ class DashboardGroupFinder:
             settings_file = self.settings_file
 
         with open(settings_file, encoding="utf-8") as f:
-            settings = yaml.safe_load(f) or {}
+            settings = safe_load(f) or {}
             if not isinstance(settings, dict):
                 return []
 
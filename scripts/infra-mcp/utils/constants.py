@@ -3,17 +3,40 @@
 This module centralizes magic numbers and configuration values used throughout the codebase.
 """
 
+import os as _os
 import platform as _platform
 
 # HTTP Request Timeouts (in seconds)
 DEFAULT_REQUEST_TIMEOUT = 10
 REGISTRY_REQUEST_TIMEOUT = 30
 
+# HTTP Connection Pooling (shared session of all tools, see utils.http)
+HTTP_POOL_CONNECTIONS = int(_os.environ.get("HTTP_POOL_CONNECTIONS", "20"))  # Number of hosts with pooled connections
+HTTP_POOL_MAXSIZE = int(_os.environ.get("HTTP_POOL_MAXSIZE", "10"))  # Number of connections kept open per host
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF_FACTOR = 0.5  # Exponential back-off: retries wait 0, 1, 2 seconds (or the Retry-After delay, see below)
+HTTP_RETRY_AFTER_MAX = 5  # Longest Retry-After delay honored before a retry, in seconds (larger delays are shortened)
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# HTTP Response Cache (shared session of all tools, see utils.http)
+HTTP_CACHE_TTL = 300  # Time responses are fresh for, in seconds
+HTTP_CACHE_HOST_TTLS = {"hub.docker.com": 600}  # Fresh time per host, overriding HTTP_CACHE_TTL
+HTTP_CACHE_STALE_TTL = 3600  # Time expired responses are still served for while revalidated in the background
+HTTP_CACHE_MAX_ENTRIES = 512  # Responses kept in memory (Docker Hub tag listings are up to 10 pages per image)
+HTTP_CACHE_DIR = _os.environ.get("HTTP_CACHE_DIR") or None  # Optional on-disk store, kept across server restarts
+HTTP_CACHE_REVALIDATION_WORKERS = 4
+HTTP_CACHE_STATS_LOG_INTERVAL = 50  # Log the hit rate every N cache lookups
+
 # Container Tag Limits
 MAX_TAGS_FETCH_LIMIT = 1000
+DOCKER_HUB_PAGE_SIZE = 100  # Maximum page size of the Docker Hub API
 DEFAULT_TAG_LIMIT = 10
 DEFAULT_SAME_HASH_LIMIT = 100
 
+# Registry Manifest Fetching
+MANIFEST_FETCH_WORKERS = 8  # Concurrent manifest requests per tag listing
+MAX_REGISTRY_CONCURRENT_REQUESTS = 8  # Concurrent manifest requests per registry, across all tool calls
+
 # Container Architecture
 
 _arch_map = {"x86_64": "amd64", "aarch64": "arm64", "armv7l": "arm"}
@@ -0,0 +1,587 @@
+"""
+HTTP session helpers for infra-mcp tools.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.response import BaseHTTPResponse
+from urllib3.util.retry import Retry
+
+from .constants import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_HOST_TTLS,
+    HTTP_CACHE_MAX_ENTRIES,
+    HTTP_CACHE_REVALIDATION_WORKERS,
+    HTTP_CACHE_STALE_TTL,
+    HTTP_CACHE_STATS_LOG_INTERVAL,
+    HTTP_CACHE_TTL,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_AFTER_MAX,
+    HTTP_RETRY_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUS_CODES,
+)
+
+logger = logging.getLogger("infra-mcp")
+
+# Paths of the registry API responses cached by CachedSession: Docker Hub tag listings, registry API v2 tag
+# listings and manifests. Other responses (e.g. web pages fetched for app icons) are never cached.
+_CACHEABLE_PATH_PATTERN = re.compile(r"^/v2/(?:repositories/.+/tags|.+/tags/list|.+/manifests/[^/]+)$")
+
+_shared_session: "CachedSession | None" = None
+_shared_session_lock = threading.Lock()
+
+
+class _StatsHTTPAdapter(HTTPAdapter):
+    """
+    An HTTP adapter recording the connection pools it uses, for per-host connection reuse statistics.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            **kwargs: Options passed to HTTPAdapter (pool sizes, retries)
+        """
+        self._pools: dict[str, list[HTTPConnectionPool]] = {}
+        self._pools_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def get_connection_with_tls_context(
+        self, request: requests.PreparedRequest, verify: bool | str | None, proxies: dict | None = None, cert: Any = None
+    ) -> HTTPConnectionPool:
+        """
+        Get the connection pool of a request, recording it for the statistics.
+        """
+        pool = super().get_connection_with_tls_context(request, verify, proxies, cert)
+        host = urlsplit(request.url).netloc
+        with self._pools_lock:
+            host_pools = self._pools.setdefault(host, [])
+            # Pools evicted from the pool manager are replaced by new ones: keep them for their counters
+            if not any(known is pool for known in host_pools):
+                host_pools.append(pool)
+        return pool
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get the connection statistics of each host.
+
+        Returns:
+            dict: Mapping of each host to its number of requests, opened connections and reused connections
+        """
+        stats = {}
+        with self._pools_lock:
+            for host, pools in self._pools.items():
+                request_count = sum(pool.num_requests for pool in pools)
+                connection_count = sum(pool.num_connections for pool in pools)
+                stats[host] = {"requests": request_count, "connections": connection_count, "reused": max(0, request_count - connection_count)}
+        return stats
+
+
+class _CappedRetry(Retry):
+    """
+    Retry configuration waiting at most HTTP_RETRY_AFTER_MAX seconds for a Retry-After delay, so that a
+    rate-limited registry asking to come back in an hour does not stall the tool call.
+    """
+
+    def get_retry_after(self, response: BaseHTTPResponse) -> float | None:
+        """
+        Get the Retry-After delay of a response, capped to HTTP_RETRY_AFTER_MAX.
+
+        Args:
+            response: The urllib3 response
+
+        Returns:
+            float: The delay in seconds, or None if the response has no Retry-After header
+        """
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, HTTP_RETRY_AFTER_MAX) if retry_after is not None else None
+
+
+class PooledSession(requests.Session):
+    """
+    A requests session keeping connections open per host, retrying GET/HEAD requests with exponential back-off
+    on connection errors, 429 and 5xx responses (waiting at most HTTP_RETRY_AFTER_MAX seconds for Retry-After).
+
+    Cookies are not kept between requests: the session is shared by unrelated tools.
+    """
+
+    def __init__(
+        self, pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE, max_retries: int = HTTP_MAX_RETRIES
+    ) -> None:
+        """
+        Initialize the PooledSession.
+
+        Args:
+            pool_connections: Number of hosts whose connections are kept open
+            pool_maxsize: Number of connections kept open per host (should match the number of concurrent requests)
+            max_retries: Number of retries of failed requests
+        """
+        super().__init__()
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        retry = _CappedRetry(
+            total=max_retries,
+            backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+            status_forcelist=HTTP_RETRY_STATUS_CODES,
+            allowed_methods=("GET", "HEAD"),
+            # Return the last response instead of raising, callers check the status
+            raise_on_status=False,
+        )
+        self.adapter = _StatsHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount("https://", self.adapter)
+        self.mount("http://", self.adapter)
+
+    def get_connection_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get the connection reuse statistics of each host.
+
+        Returns:
+            dict: Mapping of each host to its number of requests, opened connections and reused connections
+        """
+        return self.adapter.get_stats()
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached response.
+    """
+
+    url: str
+    stored_at: float
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers to revalidate the entry (from its ETag and Last-Modified headers)."""
+        headers = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    @property
+    def max_age(self) -> float | None:
+        """Fresh time set by the Cache-Control header of the response (max-age, 0 for no-cache), or None if not set."""
+        directives = parse_cache_control(CaseInsensitiveDict(self.headers).get("Cache-Control", ""))
+        if "no-cache" in directives:
+            return 0
+        try:
+            return float(directives["max-age"] or "")
+        except (KeyError, ValueError):
+            return None
+
+
+def parse_cache_control(value: str) -> dict[str, str | None]:
+    """
+    Parse a Cache-Control header.
+
+    Args:
+        value: Value of the header (e.g. "private, max-age=60")
+
+    Returns:
+        dict: Lowercase directive names mapped to their argument, or None for directives without argument
+    """
+    directives: dict[str, str | None] = {}
+    for directive in value.split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class ResponseCache:
+    """
+    A cache of responses: an in-memory LRU, backed by an optional on-disk store shared between processes.
+
+    Entries are fresh for a TTL (per host, see HTTP_CACHE_HOST_TTLS), then served stale for stale_ttl more seconds
+    while they are revalidated in the background (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        ttl: float = HTTP_CACHE_TTL,
+        stale_ttl: float = HTTP_CACHE_STALE_TTL,
+        host_ttls: dict[str, float] | None = None,
+    ) -> None:
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            cache_dir: Directory of the on-disk store. If None, responses are only cached in memory.
+            ttl: Time in seconds responses are fresh for
+            stale_ttl: Time in seconds expired responses are served for while being revalidated (0 to disable)
+            host_ttls: Fresh time of the responses of specific hosts (e.g. {"hub.docker.com": 600}), overriding ttl
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.host_ttls = host_ttls or {}
+        self.stats = {"fresh": 0, "stale": 0, "revalidated": 0, "miss": 0}
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, url: str) -> float:
+        """
+        Get the fresh time of the responses of a URL.
+
+        Args:
+            url: URL of the request
+
+        Returns:
+            float: Time in seconds
+        """
+        return self.host_ttls.get(urlsplit(url).hostname or "", self.ttl)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Get an entry, from memory or from the on-disk store.
+
+        Args:
+            key: Cache key of the request
+
+        Returns:
+            CacheEntry: The entry (fresh or not), or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store an entry in memory and in the on-disk store.
+
+        Args:
+            key: Cache key of the request
+            entry: The entry to store
+        """
+        self._remember(key, entry)
+        self._store(key, entry)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from memory and from the on-disk store.
+
+        Args:
+            key: Cache key of the request
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        cache_file = self._get_cache_file(key)
+        if cache_file is not None:
+            cache_file.unlink(missing_ok=True)
+
+    def record(self, outcome: str, url: str) -> None:
+        """
+        Count a cache lookup, logging the hit rate periodically.
+
+        Args:
+            outcome: One of "fresh", "stale" (hits), "revalidated" (304 response) or "miss"
+            url: URL of the request
+        """
+        with self._lock:
+            self.stats[outcome] += 1
+            stats = dict(self.stats)
+
+        lookups = sum(stats.values())
+        logger.debug(f"HTTP cache {outcome}: {url}")
+        if lookups % HTTP_CACHE_STATS_LOG_INTERVAL == 0:
+            logger.info(f"HTTP cache: {self.format_stats(stats)}")
+
+    def format_stats(self, stats: dict[str, int] | None = None) -> str:
+        """
+        Format cache statistics for the logs.
+
+        Args:
+            stats: Statistics to format. If None, the current statistics.
+
+        Returns:
+            str: Summary with the hit rate (fresh and stale hits over lookups)
+        """
+        stats = stats or self.stats
+        lookups = sum(stats.values())
+        hit_rate = (stats["fresh"] + stats["stale"]) / lookups if lookups else 0
+        return f"{lookups} lookups, hit rate {hit_rate:.0%} ({', '.join(f'{count} {outcome}' for outcome, count in stats.items())})"
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store an entry in memory, evicting the least recently used entries.
+
+        Args:
+            key: Cache key of the request
+            entry: The entry to store
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > HTTP_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def _get_cache_file(self, key: str) -> Path | None:
+        """Get the on-disk store file of a cache key, None if there is no on-disk store."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _load(self, key: str) -> CacheEntry | None:
+        """
+        Load an entry from the on-disk store.
+
+        Args:
+            key: Cache key of the request
+
+        Returns:
+            CacheEntry: The stored entry, or None if not stored
+        """
+        cache_file = self._get_cache_file(key)
+        if cache_file is None:
+            return None
+
+        try:
+            with open(cache_file, encoding="utf-8") as stream:
+                data = json.load(stream)
+            return CacheEntry(data["url"], data["stored_at"], data["status"], data["headers"], base64.b64decode(data["body"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        """
+        Write an entry to the on-disk store, replacing the previous one atomically.
+
+        Args:
+            key: Cache key of the request
+            entry: The entry to store
+        """
+        cache_file = self._get_cache_file(key)
+        if cache_file is None:
+            return
+
+        data = {
+            "url": entry.url,
+            "stored_at": entry.stored_at,
+            "status": entry.status,
+            "headers": entry.headers,
+            "body": base64.b64encode(entry.body).decode("ascii"),
+        }
+        temp_file = cache_file.with_name(f"{cache_file.name}.{threading.get_ident()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, "w", encoding="utf-8") as stream:
+                json.dump(data, stream)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            # The cache is an optimization only
+            return
+
+
+class CachedSession(PooledSession):
+    """
+    A requests session serving successful GET responses of registry APIs (tag listings and manifests) from a ResponseCache.
+
+    Expired responses are revalidated with conditional requests (ETag/Last-Modified): a 304 response refreshes
+    the cached one without downloading it again.
+    Requests sent with a "Cache-Control: no-store" header (e.g. authentication token requests) are never cached,
+    nor are responses with a "no-store" or "private" Cache-Control header. A response's max-age (0 for no-cache)
+    shortens its fresh time.
+    The cache key is the URL, the Accept header and whether the request has an Authorization header: anonymous and
+    authorized responses are kept apart, but authorized responses are shared between credentials, as the tools only
+    send anonymous registry tokens (which change with every token request).
+    Requests with an Authorization header are not served stale: their credentials may have expired by the time of a
+    background revalidation, so they are revalidated by the caller, who can renew them.
+    """
+
+    def __init__(self, cache: ResponseCache | None = None, pool_maxsize: int = HTTP_POOL_MAXSIZE) -> None:
+        """
+        Initialize the CachedSession.
+
+        Args:
+            cache: The response cache. If None, an in-memory cache with the default TTLs.
+            pool_maxsize: Number of connections kept open per host (should match the number of concurrent requests)
+        """
+        super().__init__(pool_maxsize=pool_maxsize)
+        self.cache = cache or ResponseCache()
+        self._revalidations: set[str] = set()
+        self._revalidations_lock = threading.Lock()
+        self._revalidation_executor = ThreadPoolExecutor(max_workers=HTTP_CACHE_REVALIDATION_WORKERS, thread_name_prefix="http-revalidate")
+
+    def _get_cache_key(self, request: requests.PreparedRequest) -> str | None:
+        """
+        Get the cache key of a request.
+
+        Args:
+            request: The request to send
+
+        Returns:
+            str: The cache key, or None if the request must not be cached
+        """
+        if request.method != "GET" or request.headers.get("Cache-Control") == "no-store":
+            return None
+        if not _CACHEABLE_PATH_PATTERN.match(urlsplit(request.url).path):
+            return None
+        authorized = "authorized" if "Authorization" in request.headers else "anonymous"
+        return f"{request.url}\n{request.headers.get('Accept', '')}\n{authorized}"
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, serving it from the cache when a fresh (or revalidating) response is stored.
+
+        Args:
+            request: The request to send
+            **kwargs: Options passed to requests.Session.send
+
+        Returns:
+            Response: The cached or received response
+        """
+        key = self._get_cache_key(request)
+        if key is None:
+            return super().send(request, **kwargs)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = time.time() - entry.stored_at
+            ttl = self.cache.get_ttl(request.url)
+            if entry.max_age is not None:
+                ttl = min(ttl, entry.max_age)
+            if age <= ttl:
+                self.cache.record("fresh", request.url)
+                return self._build_response(entry, request)
+            if "Authorization" not in request.headers and age <= ttl + self.cache.stale_ttl:
+                self.cache.record("stale", request.url)
+                self._schedule_revalidation(key, entry, request, kwargs)
+                return self._build_response(entry, request)
+
+        response, outcome = self._fetch(key, entry, request, kwargs)
+        self.cache.record(outcome, request.url)
+        return response
+
+    def _fetch(self, key: str, entry: CacheEntry | None, request: requests.PreparedRequest, kwargs: dict[str, Any]) -> tuple[requests.Response, str]:
+        """
+        Send a request, conditionally if an expired entry is cached, and update the cache.
+
+        Args:
+            key: Cache key of the request
+            entry: The expired entry, or None if not cached
+            request: The request to send
+            kwargs: Options passed to requests.Session.send
+
+        Returns:
+            tuple: The received response or the revalidated entry, and the cache outcome ("revalidated" or "miss")
+        """
+        if entry is not None and entry.validators:
+            request = request.copy()
+            request.headers.update(entry.validators)
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            entry = CacheEntry(entry.url, time.time(), entry.status, {**entry.headers, **response.headers}, entry.body)
+            self.cache.put(key, entry)
+            return self._build_response(entry, request), "revalidated"
+
+        directives = parse_cache_control(response.headers.get("Cache-Control", ""))
+        if response.status_code == 200 and "no-store" not in directives and "private" not in directives:
+            self.cache.put(key, CacheEntry(response.url, time.time(), response.status_code, dict(response.headers), response.content))
+        return response, "miss"
+
+    def _schedule_revalidation(self, key: str, entry: CacheEntry, request: requests.PreparedRequest, kwargs: dict[str, Any]) -> None:
+        """
+        Revalidate a stale entry in the background, unless it is already being revalidated.
+
+        The entry is removed if the server now requires authentication (401/403 response), so it is not served anymore.
+
+        Args:
+            key: Cache key of the request
+            entry: The stale entry
+            request: The request to send
+            kwargs: Options passed to requests.Session.send
+        """
+        with self._revalidations_lock:
+            if key in self._revalidations:
+                return
+            self._revalidations.add(key)
+
+        def revalidate() -> None:
+            try:
+                response, _ = self._fetch(key, entry, request.copy(), kwargs)
+                response.close()
+                if response.status_code in {401, 403}:
+                    self.cache.delete(key)
+            except requests.RequestException as e:
+                logger.debug(f"HTTP cache revalidation failed: {request.url}: {e}")
+            finally:
+                with self._revalidations_lock:
+                    self._revalidations.discard(key)
+
+        self._revalidation_executor.submit(revalidate)
+
+    def _build_response(self, entry: CacheEntry, request: requests.PreparedRequest) -> requests.Response:
+        """
+        Build a response from a cache entry.
+
+        Args:
+            entry: The cache entry
+            request: The request sent
+
+        Returns:
+            Response: The cached response
+        """
+        response = requests.Response()
+        response.status_code = entry.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def get_session() -> CachedSession:
+    """
+    Get the session shared by all tools of the process, creating it on first use.
+
+    Registry API responses are cached in memory, and on disk if the HTTP_CACHE_DIR environment variable is set.
+
+    Returns:
+        CachedSession: The shared session
+    """
+    global _shared_session  # noqa: PLW0603 - process-wide singleton
+    with _shared_session_lock:
+        if _shared_session is None:
+            cache_dir = Path(HTTP_CACHE_DIR) if HTTP_CACHE_DIR else None
+            _shared_session = CachedSession(ResponseCache(cache_dir, host_ttls=HTTP_CACHE_HOST_TTLS))
+        return _shared_session
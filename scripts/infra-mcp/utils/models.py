@@ -5,6 +5,7 @@ This module contains dataclass definitions for shared data structures used throu
 
 import platform
 from dataclasses import dataclass, field
+from typing import Any
 
 _arch_map = {"x86_64": "amd64", "aarch64": "arm64", "armv7l": "arm"}
 
@@ -25,6 +26,7 @@ class ContainerTagFinderArgs:
         quiet: Whether to suppress output
         registry: Optional registry URL for private registries
         tag: Optional tag to use as reference (for same-hash operations)
+        sort: Sort method - 'version', 'updated' (most recently updated first), or 'default' (registry order)
     """
 
     image: str
@@ -33,3 +35,28 @@ class ContainerTagFinderArgs:
     quiet: bool = True
     registry: str | None = None
     tag: str | None = None
+    sort: str = "version"
+
+
+@dataclass
+class TagAnalysis:
+    """Analysis of the tags of a container image, from a single tag retrieval (see ContainerTagFinder.analyze_tags).
+
+    Attributes:
+        tags: All retrieved tags, sorted as requested
+        reference_tag: The tag used as reference (the requested tag, or the first tag), None if not found
+        same_digest_tags: Tags with the same digest as the reference tag
+        ranked_tags: The same-digest tags with their specificity score, most specific first
+        error: Why there are no same-digest tags (e.g. tag not found), None otherwise
+    """
+
+    tags: list[dict[str, Any]] = field(default_factory=list)
+    reference_tag: dict[str, Any] | None = None
+    same_digest_tags: list[dict[str, Any]] = field(default_factory=list)
+    ranked_tags: list[tuple[dict[str, Any], int]] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def most_specific_tag(self) -> dict[str, Any] | None:
+        """The most specific same-digest tag, None if there are fewer than two tags to choose from."""
+        return self.ranked_tags[0][0] if len(self.ranked_tags) >= 2 else None
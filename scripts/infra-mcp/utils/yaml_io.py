@@ -0,0 +1,29 @@
+"""
+YAML loading for infra-mcp tools, using the libyaml C implementation when available.
+"""
+
+from typing import IO, Any
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+
+    YAML_BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeLoader
+
+    YAML_BACKEND = "python"
+
+
+def safe_load(stream: str | bytes | IO) -> Any:
+    """
+    Parse a YAML document, constructing only standard YAML types.
+
+    Args:
+        stream: YAML content or an open file
+
+    Returns:
+        The parsed document
+    """
+    return yaml.load(stream, Loader=SafeLoader)  # noqa: S506 - SafeLoader is yaml.CSafeLoader or yaml.SafeLoader
@@ -2,26 +2,66 @@
 """Docker services management script using YAML configuration."""
 
 import argparse
+import hashlib
+import http.client
+import json
 import logging
 import os
+import queue
+import re
 import shutil
 import socket
 import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Any
+from urllib.parse import quote, urlencode
 
 try:
-    import yaml
-except ModuleNotFoundError:
-    print("Error: 'yaml' module not found. Install it with: pip3 install pyyaml", file=sys.stderr)
+    from utils.yaml_io import YAML_BACKEND, YAMLError, safe_load
+except ModuleNotFoundError as e:
+    if e.name == "yaml":
+        print("Error: 'yaml' module not found. Install it with: pip3 install pyyaml", file=sys.stderr)
+    else:
+        print(f"Error: '{e.name}' module not found: {e}", file=sys.stderr)
     sys.exit(1)
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
 DOCKER_STACKS_DIR: Path = (Path(__file__).resolve().parent.parent / "docker").resolve()
+APPLY_STATE_DIR: Path = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state") / "labctl"
 ALLOWED_OPERATIONS: tuple[str, ...] = ("pull", "up", "down", "restart", "recreate", "config", "logs")
+FAILURE_POLICIES: tuple[str, ...] = ("stop", "continue")
+APPLY_ORDERS: tuple[str, ...] = ("config", "deps")
+# Operations that (re)start containers: dependencies are processed first (and last for "down")
+START_OPERATIONS: tuple[str, ...] = ("up", "recreate", "restart")
+# Maximum number of log lines buffered between the log readers and the output, applying back-pressure to chatty containers
+LOG_QUEUE_SIZE = 1000
+LOG_PREFIX_COLORS: tuple[str, ...] = ("\033[36m", "\033[33m", "\033[32m", "\033[35m", "\033[34m", "\033[91m", "\033[96m", "\033[93m")
+# Concurrent image pulls from the same registry during the pull phase, to stay friendly to registry rate limits and bandwidth
+MAX_PULLS_PER_REGISTRY = 3
+
+# Per-thread output buffer used by parallel workers, so each stack's output can be printed as one block
+_stack_output = threading.local()
+
+
+class _StackOutputFilter(logging.Filter):
+    """Divert log records of a worker thread into its stack output buffer instead of printing them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        lines = getattr(_stack_output, "lines", None)
+        if lines is None:
+            return True
+        lines.append(record.getMessage())
+        return False
+
+
+logger.addFilter(_StackOutputFilter())
 
 
 @dataclass
@@ -30,6 +70,8 @@ class DockerOptions:
 
     pull_before_start: bool = False
     quiet: bool = False
+    # Create missing external networks before starting a service (off when they were provisioned up front)
+    ensure_networks: bool = True
     # Log options
     follow: bool = False
     tail: str = "all"
@@ -37,13 +79,435 @@ class DockerOptions:
     timestamps: bool = False
 
 
+@dataclass
+class ApplyOptions:
+    """Configuration options for applying the services configuration."""
+
+    jobs: int = 1
+    on_failure: str = "stop"
+    order: str = "config"
+    skip_unchanged: bool = False
+    pull_jobs: int = 4
+    wait: bool = False
+    wait_timeout: float = 300
+
+
+@dataclass
+class StackTask:
+    """A single stack operation selected from the services configuration."""
+
+    category: str
+    name: str
+    action: str
+    after: list[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        """Stack identifier in category/name format."""
+        return f"{self.category}/{self.name}"
+
+
+@dataclass
+class StackResult:
+    """Outcome of a stack operation: status is 'ok', 'unchanged', 'failed' or 'skipped'."""
+
+    task: StackTask
+    status: str = "skipped"
+    duration: float = 0.0
+    # Seconds between the end of "up" and all containers being running/healthy (with --wait)
+    ready_time: float | None = None
+    output: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ImagePull:
+    """An image pulled in the pull phase, shared by one or more stacks: status is 'ok', 'failed' or 'skipped'."""
+
+    image: str
+    stacks: list[str] = field(default_factory=list)
+    status: str = "skipped"
+    duration: float = 0.0
+    size: int | None = None
+
+
+class DockerEngineError(RuntimeError):
+    """Raised when the Docker Engine API returns an unexpected response."""
+
+
+class StackNotReadyError(RuntimeError):
+    """Raised when the containers of a stack do not become ready in time."""
+
+
+def get_docker_socket(docker_host: str) -> str | None:
+    """Get the daemon socket path from a DOCKER_HOST value, or None if the daemon is not reached through a Unix socket (tcp://, ssh://)."""
+    if not docker_host:
+        return "/var/run/docker.sock"
+    if docker_host.startswith("unix://"):
+        return docker_host.removeprefix("unix://")
+    return None
+
+
+DOCKER_SOCKET: str | None = get_docker_socket(os.environ.get("DOCKER_HOST", ""))
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float = 60) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerEngineClient:
+    """Minimal Docker Engine API client talking to the daemon socket directly.
+
+    Keeps one persistent (keep-alive) connection per thread, avoiding a docker CLI process per query.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> tuple[int, Any]:
+        """Send a request and return the status code and the decoded JSON response (None if empty).
+
+        GET requests are retried once on a new connection if the daemon closed the idle keep-alive connection. Other requests
+        are not idempotent and are sent once, since they may have been processed before the connection failed.
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+
+        attempts = 2 if method == "GET" else 1
+        for attempt in range(1, attempts + 1):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = _UnixHTTPConnection(self.socket_path)
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._local.conn = None
+                if attempt == attempts:
+                    raise DockerEngineError(f"Docker Engine API request {method} {path} failed: {e}") from e
+
+        # Some endpoints (e.g. /_ping) answer with plain text
+        is_json = response.getheader("Content-Type", "").startswith("application/json")
+        return response.status, json.loads(data) if data and is_json else None
+
+    def ping(self) -> bool:
+        """Check whether the daemon is reachable through the socket."""
+        try:
+            status, _ = self._request("GET", "/_ping")
+        except DockerEngineError:
+            return False
+        return status == 200
+
+    def network_exists(self, name: str) -> bool:
+        """Check whether a network exists."""
+        status, data = self._request("GET", f"/networks/{quote(name, safe='')}")
+        if status not in {200, 404}:
+            raise DockerEngineError(f"Inspecting network {name} failed: {data}")
+        return status == 200
+
+    def list_networks(self) -> list[str]:
+        """List the names of all networks."""
+        status, data = self._request("GET", "/networks")
+        if status != 200:
+            raise DockerEngineError(f"Listing networks failed: {data}")
+        return [network["Name"] for network in data or []]
+
+    def create_network(self, name: str, driver: str = "bridge") -> None:
+        """Create a network."""
+        status, data = self._request("POST", "/networks/create", {"Name": name, "Driver": driver, "CheckDuplicate": True})
+        if status != 201:
+            raise DockerEngineError(f"Creating network {name} failed: {data}")
+
+    def list_containers(self, labels: list[str]) -> list[dict]:
+        """List all containers (including stopped ones) having all the given labels, except Compose one-off (run) containers."""
+        query = urlencode({"all": "true", "filters": json.dumps({"label": [*labels, "com.docker.compose.oneoff=False"]})})
+        status, data = self._request("GET", f"/containers/json?{query}")
+        if status != 200:
+            raise DockerEngineError(f"Listing containers failed: {data}")
+        return data or []
+
+    def get_image_size(self, image: str) -> int | None:
+        """Get the size of a local image in bytes, or None if it does not exist."""
+        status, data = self._request("GET", f"/images/{quote(image, safe='')}/json")
+        return data.get("Size") if status == 200 else None
+
+
+# Engine API client used instead of docker CLI queries when enabled with --engine-api
+engine_client: DockerEngineClient | None = None
+
+
+class ComposeCache:
+    """Per-run cache of read compose/.env files and parsed compose files, keyed by path and modification time.
+
+    Compose files are parsed from the cached text, so each file is read once. Concurrent misses of the same file wait for
+    the first one instead of loading it again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, Path], tuple[int, Any]] = {}
+        self._key_locks: dict[tuple[str, Path], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.parses = 0
+        self.hits = 0
+
+    def _get(self, kind: str, path: Path, load: Any) -> Any:
+        """Return the cached value for the file, (re)loading it if it is new or was modified."""
+        mtime = path.stat().st_mtime_ns
+        key = (kind, path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == mtime:
+                    self.hits += 1
+                    return entry[1]
+
+            value = load(path)
+            with self._lock:
+                if kind == "yaml":
+                    self.parses += 1
+                else:
+                    self.reads += 1
+                self._entries[key] = (mtime, value)
+        return value
+
+    def load_yaml(self, path: Path) -> Any:
+        """Load a YAML file. The returned object is shared between callers and must not be modified."""
+        return self._get("yaml", path, lambda p: safe_load(self.read_text(p)))
+
+    def read_text(self, path: Path) -> str:
+        """Read a text file."""
+        return self._get("text", path, lambda p: p.read_text())
+
+
+compose_cache = ComposeCache()
+
+
+class ApplyState:
+    """Fingerprints of the stack inputs at their last successful start, persisted between runs."""
+
+    def __init__(self, state_file: Path) -> None:
+        self.state_file = state_file
+        self.fingerprints: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        try:
+            self.fingerprints = json.loads(state_file.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state file {state_file}: {e}")
+
+    def matches(self, label: str, fingerprint: str) -> bool:
+        """Check whether the stack was last started with the same inputs."""
+        with self._lock:
+            return self.fingerprints.get(label) == fingerprint
+
+    def record(self, label: str, fingerprint: str | None) -> None:
+        """Record the fingerprint of a started stack, or forget the stack if fingerprint is None."""
+        with self._lock:
+            if fingerprint is None:
+                self.fingerprints.pop(label, None)
+            else:
+                self.fingerprints[label] = fingerprint
+
+    def save(self) -> None:
+        """Write the fingerprints to the state file."""
+        with self._lock:
+            content = json.dumps(self.fingerprints, indent=2, sort_keys=True)
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(content + "\n")
+        except OSError:
+            logger.exception(f"Error writing state file {self.state_file}")
+
+
+@dataclass
+class ApplyContext:
+    """Shared settings and state of a config apply run."""
+
+    host_config_dir: Path
+    options: DockerOptions
+    apply_options: ApplyOptions
+    state: ApplyState | None = None
+    # Set when images were pulled in the pull phase: stacks are restarted to pick them up, even if unchanged
+    pulled_images: bool = False
+    # Stacks whose images could not be pulled or built in the pull phase
+    failed_pulls: set[str] = field(default_factory=set)
+    readiness: "ReadinessMonitor | None" = None
+    # Container states of all Compose projects, queried once at the start of the run (with an apply state)
+    project_containers: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+
+
+def list_compose_containers() -> dict[str, list[tuple[str, str]]]:
+    """Get the (state, status) of the containers of each Compose project with a single query."""
+    states: dict[str, list[tuple[str, str]]] = {}
+    if engine_client is not None:
+        for container in engine_client.list_containers(["com.docker.compose.project"]):
+            project = container.get("Labels", {}).get("com.docker.compose.project", "")
+            states.setdefault(project, []).append((container.get("State", ""), container.get("Status", "")))
+        return states
+
+    output = docker_output(
+        [
+            "ps",
+            "--all",
+            "--filter",
+            "label=com.docker.compose.project",
+            "--filter",
+            "label=com.docker.compose.oneoff=False",
+            "--format",
+            '{{.Label "com.docker.compose.project"}}\t{{.State}}\t{{.Status}}',
+        ]
+    )
+    for line in output.splitlines():
+        project, _, rest = line.partition("\t")
+        state, _, status = rest.partition("\t")
+        states.setdefault(project, []).append((state, status))
+    return states
+
+
+def is_container_ready(state: str, status: str) -> bool:
+    """Check a container's state and status text: running and healthy (if it has a health check), or completed successfully."""
+    if state == "exited":
+        return status.startswith("Exited (0)")
+    return state == "running" and "(health: starting)" not in status and "(unhealthy)" not in status
+
+
+def is_container_failed(state: str, status: str) -> bool:
+    """Check a container's state and status text: exited with a non-zero code, or dead."""
+    return state == "dead" or (state == "exited" and not status.startswith("Exited (0)"))
+
+
+class ReadinessMonitor:
+    """Polls the state of all Compose containers with a single query, for all stacks waiting to become ready.
+
+    The poll interval backs off from MIN_INTERVAL to MAX_INTERVAL, and is reset when a new stack starts waiting.
+    """
+
+    MIN_INTERVAL = 0.5
+    MAX_INTERVAL = 5.0
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._waiting: dict[str, int] = {}
+        self._states: dict[str, list[tuple[str, str]]] = {}
+        # Sequence number of the last poll started, and of the poll the current states come from
+        self._poll_seq = 0
+        self._states_seq = 0
+        self._interval = self.MIN_INTERVAL
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        """Poll while there are stacks waiting, then notify them."""
+        while True:
+            with self._condition:
+                while not self._waiting and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                self._poll_seq += 1
+                seq = self._poll_seq
+
+            try:
+                states = list_compose_containers()
+            except (subprocess.CalledProcessError, RuntimeError) as e:
+                logger.warning(f"Error polling container states: {e}")
+                states = None
+
+            with self._condition:
+                if states is not None:
+                    self._states = states
+                    self._states_seq = seq
+                    self._condition.notify_all()
+                interval = self._interval
+                self._interval = min(self._interval * 2, self.MAX_INTERVAL)
+                self._condition.wait(timeout=interval)
+
+    def wait_ready(self, project: str, timeout: float) -> bool:
+        """Wait until all containers of a Compose project are ready.
+
+        A project without containers (e.g. all its services are in disabled profiles) is ready as soon as it is polled.
+
+        Returns:
+            True if the project became ready, False if the timeout expired
+
+        Raises:
+            StackNotReadyError: If a container of the project exited with a non-zero code (it will not become ready).
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="labctl-readiness", daemon=True)
+                self._thread.start()
+            self._waiting[project] = self._waiting.get(project, 0) + 1
+            self._interval = self.MIN_INTERVAL
+            self._condition.notify_all()
+
+            # Only trust states of polls started after "up" returned, not of a poll already running
+            registered_seq = self._poll_seq
+            try:
+                while True:
+                    containers = self._states.get(project, [])
+                    if self._states_seq > registered_seq:
+                        failed = [status for state, status in containers if is_container_failed(state, status)]
+                        if failed:
+                            raise StackNotReadyError(f"container failed: {failed[0]}")
+                        if all(is_container_ready(*c) for c in containers):
+                            return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(timeout=remaining)
+            finally:
+                self._waiting[project] -= 1
+                if not self._waiting[project]:
+                    del self._waiting[project]
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+
+def create_network(network_name: str) -> None:
+    """Create a Docker bridge network."""
+    logger.info(f"Creating network: {network_name}")
+    if engine_client is not None:
+        engine_client.create_network(network_name)
+    else:
+        docker(["network", "create", "--driver", "bridge", network_name])
+
+
 def create_network_if_missing(network_name: str) -> None:
     """Create Docker network if it doesn't exist."""
+    if engine_client is not None:
+        if not engine_client.network_exists(network_name):
+            create_network(network_name)
+        return
+
     try:
         docker(["network", "inspect", network_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except subprocess.CalledProcessError:
-        logger.info(f"Creating network: {network_name}")
-        docker(["network", "create", "--driver", "bridge", network_name])
+        create_network(network_name)
 
 
 def get_external_networks(compose_file: Path) -> list[str]:
@@ -52,12 +516,13 @@ def get_external_networks(compose_file: Path) -> list[str]:
     Supports formats: external: true | external: {name: "..."} | name: "..."
     """
     try:
-        with open(compose_file) as f:
-            yaml_content = yaml.safe_load(f) or {}
-    except (FileNotFoundError, yaml.YAMLError, OSError) as e:
+        yaml_content = compose_cache.load_yaml(compose_file) or {}
+    except (FileNotFoundError, YAMLError, OSError) as e:
         logger.warning(f"Error extracting networks from {compose_file}: {e}")
         return []
 
+    if not isinstance(yaml_content, dict):
+        return []
     networks_def = yaml_content.get("networks") or {}
     if not isinstance(networks_def, dict):
         return []
@@ -76,12 +541,70 @@ def get_external_networks(compose_file: Path) -> list[str]:
     return list(dict.fromkeys(networks))
 
 
+def load_compose_services(compose_file: Path) -> dict:
+    """Load the services section of a Docker Compose file, or an empty dict if it cannot be read."""
+    try:
+        yaml_content = compose_cache.load_yaml(compose_file) or {}
+    except (FileNotFoundError, YAMLError, OSError) as e:
+        logger.warning(f"Error loading services from {compose_file}: {e}")
+        return {}
+
+    services = yaml_content.get("services") if isinstance(yaml_content, dict) else None
+    return services if isinstance(services, dict) else {}
+
+
+def get_external_service_dependencies(services: dict) -> list[str]:
+    """Get the depends_on targets that are not defined in the same compose file.
+
+    Compose accepts these only with `required: false`; they refer to services of other stacks.
+    """
+    dependencies: list[str] = []
+    for svc in services.values():
+        depends_on = svc.get("depends_on") if isinstance(svc, dict) else None
+        if isinstance(depends_on, dict | list):
+            dependencies.extend(str(target) for target in depends_on if target not in services)
+    return list(dict.fromkeys(dependencies))
+
+
 def create_service_networks(compose_file: Path) -> None:
     """Create all external networks required by a service."""
     for network_name in get_external_networks(compose_file):
         create_network_if_missing(network_name)
 
 
+def list_networks() -> set[str]:
+    """List the names of the existing Docker networks with a single daemon call."""
+    if engine_client is not None:
+        return set(engine_client.list_networks())
+    return set(docker_output(["network", "ls", "--format", "{{.Name}}"]).split())
+
+
+def provision_networks(tasks: list[StackTask]) -> bool:
+    """Create the external networks of all stacks being (re)started, before any of them starts.
+
+    Returns:
+        True if all networks exist, False if they could not be listed or created
+    """
+    required: list[str] = []
+    for task in tasks:
+        compose_file = get_compose_file(DOCKER_STACKS_DIR / task.category, task.name)
+        if task.action in {"up", "recreate"} and compose_file.exists():
+            required.extend(get_external_networks(compose_file))
+    if not required:
+        return True
+
+    try:
+        existing = list_networks()
+        for network_name in dict.fromkeys(required):
+            if network_name not in existing:
+                create_network(network_name)
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        logger.warning(f"Error provisioning networks, creating them per service: {e}")
+        return False
+
+    return True
+
+
 def create_localhost_link(docker_config_dir: Path) -> None:
     """Create 'localhost' symlink pointing to the current hostname directory."""
     hostname = socket.gethostname().lower()
@@ -111,8 +634,7 @@ def get_compose_file(stack_dir: Path, service_name: str) -> Path:
 
 def has_build_directive(compose_file: Path) -> bool:
     """Check if the compose file contains any build directives."""
-    with open(compose_file) as f:
-        yaml_content = yaml.safe_load(f)
+    yaml_content = compose_cache.load_yaml(compose_file)
     if not yaml_content:
         return False
     services = yaml_content.get("services")
@@ -145,19 +667,146 @@ def get_env_file_args(host_config_dir: Path, service_name: str) -> list[str]:
     return args
 
 
-def get_gpu_suffix(host_config_dir: Path) -> str | None:
-    """Read GPU_COMPOSE_SUFFIX from the host-specific .env file."""
-    env_file = host_config_dir / ".env"
+def get_env_file_value(env_file: Path, name: str) -> str | None:
+    """Read a variable from a .env file, or None if the file does not exist or does not set it."""
     if not env_file.exists():
         return None
-    for line in env_file.read_text().splitlines():
+    for line in compose_cache.read_text(env_file).splitlines():
         stripped = line.strip()
-        if stripped.startswith("GPU_COMPOSE_SUFFIX="):
-            value = stripped.split("=", 1)[1].strip().strip("\"'")
-            return value or None
+        if stripped.startswith(f"{name}="):
+            return stripped.split("=", 1)[1].strip().strip("\"'")
     return None
 
 
+def get_gpu_suffix(host_config_dir: Path) -> str | None:
+    """Read GPU_COMPOSE_SUFFIX from the host-specific .env file."""
+    return get_env_file_value(host_config_dir / ".env", "GPU_COMPOSE_SUFFIX") or None
+
+
+def get_compose_files(host_config_dir: Path, stack_dir: Path, service_name: str) -> list[Path]:
+    """Get the compose files of a service: the base file and the GPU override selected by the host, if any."""
+    compose_file = get_compose_file(stack_dir, service_name)
+    compose_files = [compose_file]
+    suffix = get_gpu_suffix(host_config_dir)
+    if suffix:
+        override = compose_file.parent / f"{service_name}-{suffix}.yaml"
+        if override.exists():
+            compose_files.append(override)
+    return compose_files
+
+
+def get_referenced_compose_files(compose_files: list[Path]) -> list[Path]:
+    """Get the compose files pulled in by include and extends directives, recursively.
+
+    Relative paths are resolved against the directory of the referencing file. Paths that do not exist are returned as well.
+    """
+    referenced: list[Path] = []
+    seen = set(compose_files)
+    pending = list(compose_files)
+    while pending:
+        compose_file = pending.pop(0)
+        yaml_content = compose_cache.load_yaml(compose_file) if compose_file.is_file() else None
+        if not isinstance(yaml_content, dict):
+            continue
+
+        references: list[Any] = []
+        for entry in yaml_content.get("include") or []:
+            paths = entry.get("path") if isinstance(entry, dict) else entry
+            references.extend(paths if isinstance(paths, list) else [paths])
+        services = yaml_content.get("services")
+        for svc in services.values() if isinstance(services, dict) else []:
+            extends = svc.get("extends") if isinstance(svc, dict) else None
+            if isinstance(extends, dict):
+                references.append(extends.get("file"))
+
+        for reference in references:
+            if not isinstance(reference, str) or not reference:
+                continue
+            path = Path(os.path.normpath(compose_file.parent / reference))
+            if path not in seen:
+                seen.add(path)
+                referenced.append(path)
+                pending.append(path)
+    return referenced
+
+
+def get_build_contexts(compose_files: list[Path]) -> list[Path]:
+    """Get the local build context directories of the services of the compose files (remote contexts are skipped)."""
+    contexts: list[Path] = []
+    for compose_file in compose_files:
+        yaml_content = compose_cache.load_yaml(compose_file) if compose_file.is_file() else None
+        services = yaml_content.get("services") if isinstance(yaml_content, dict) else None
+        for svc in services.values() if isinstance(services, dict) else []:
+            build = svc.get("build") if isinstance(svc, dict) else None
+            if isinstance(build, dict):
+                build = build.get("context", ".")
+            if isinstance(build, str) and "://" not in build and not build.startswith("git@"):
+                contexts.append(Path(os.path.normpath(compose_file.parent / build)))
+    return list(dict.fromkeys(contexts))
+
+
+def get_stack_fingerprint(compose_files: list[Path], env_file_args: list[str]) -> str:
+    """Hash the inputs of a stack.
+
+    These are its compose files and the files they include or extend, the .env files passed to Docker Compose,
+    and the build contexts of its services. Build context files are hashed by path, size and modification time.
+    """
+    all_compose_files = [*compose_files, *get_referenced_compose_files(compose_files)]
+    digest = hashlib.sha256()
+    for file in [*all_compose_files, *map(Path, env_file_args[1::2])]:
+        digest.update(f"{file}\0".encode())
+        digest.update(compose_cache.read_text(file).encode() if file.is_file() else b"(missing)")
+        digest.update(b"\0")
+
+    for context in get_build_contexts(all_compose_files):
+        digest.update(f"{context}/\0".encode())
+        for path in sorted(context.rglob("*")) if context.is_dir() else []:
+            if path.is_file():
+                stat = path.stat()
+                digest.update(f"{path.relative_to(context)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def _get_docker_executable() -> str:
+    """Locate the docker executable on PATH."""
+    docker_bin = shutil.which("docker")
+    if docker_bin is None:
+        raise RuntimeError("Docker executable not found on PATH.")
+    return docker_bin
+
+
+def docker_output(cmd: list[str]) -> str:
+    """Execute a docker command with the given arguments and return its standard output."""
+    result = subprocess.run([_get_docker_executable(), *cmd], stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True)  # noqa: S603
+    return result.stdout
+
+
+def get_project_name(compose_files: list[Path], env_file_args: list[str]) -> str:
+    """Get the Compose project name, with the same precedence as Docker Compose.
+
+    This is COMPOSE_PROJECT_NAME from the environment or the .env files (the last file setting it wins),
+    then the top-level name of the compose files, then the normalized directory name.
+    """
+    if os.environ.get("COMPOSE_PROJECT_NAME"):
+        return os.environ["COMPOSE_PROJECT_NAME"]
+    for env_file in reversed([Path(arg) for arg in env_file_args[1::2]]):
+        name = get_env_file_value(env_file, "COMPOSE_PROJECT_NAME")
+        if name:
+            return name
+
+    name = None
+    for compose_file in compose_files:
+        yaml_content = compose_cache.load_yaml(compose_file)
+        if isinstance(yaml_content, dict) and yaml_content.get("name"):
+            name = str(yaml_content["name"])
+    return name or re.sub(r"[^a-z0-9_-]", "", compose_files[0].parent.name.lower())
+
+
+def is_stack_running(containers: list[tuple[str, str]]) -> bool:
+    """Check whether all containers of a stack, given as (state, status), are running (one-off containers may have exited successfully)."""
+    return bool(containers) and all(state == "running" or (state == "exited" and status.startswith("Exited (0)")) for state, status in containers)
+
+
 def docker(
     cmd: list[str],
     env: dict[str, str] | None = None,
@@ -166,10 +815,25 @@ def docker(
     stderr: int | None = None,
 ) -> None:
     """Execute a docker command with the given arguments."""
-    docker_bin = shutil.which("docker")
-    if docker_bin is None:
-        raise RuntimeError("Docker executable not found on PATH.")
-    subprocess.run([docker_bin, *cmd], env=env, stdin=stdin, stdout=stdout, stderr=stderr, check=True)  # noqa: S603
+    docker_bin = _get_docker_executable()
+
+    lines = getattr(_stack_output, "lines", None)
+    if lines is None or stdout is not None:
+        subprocess.run([docker_bin, *cmd], env=env, stdin=stdin, stdout=stdout, stderr=stderr, check=True)  # noqa: S603
+        return
+
+    # Running in a parallel worker: capture the output into the stack's buffer
+    result = subprocess.run(  # noqa: S603
+        [docker_bin, *cmd],
+        env=env,
+        stdin=subprocess.DEVNULL if stdin is None else stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if stderr is None else stderr,
+        text=True,
+        check=False,
+    )
+    lines.extend(result.stdout.splitlines())
+    result.check_returncode()
 
 
 def docker_pull(
@@ -198,6 +862,133 @@ def docker_pull(
         docker(cmd)
 
 
+def get_image_registry(image: str) -> str:
+    """Get the registry host of an image reference (docker.io for Docker Hub images)."""
+    first, _, rest = image.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        return first
+    return "docker.io"
+
+
+def get_image_size(image: str) -> int | None:
+    """Get the size of a local image in bytes, or None if it is not available."""
+    try:
+        if engine_client is not None:
+            return engine_client.get_image_size(image)
+        return int(docker_output(["image", "inspect", "--format", "{{.Size}}", image]).strip())
+    except (subprocess.CalledProcessError, RuntimeError, ValueError):
+        return None
+
+
+def format_size(size: int | None) -> str:
+    """Format a size in bytes as a human readable string."""
+    if size is None:
+        return "-"
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def get_stack_images(host_config_dir: Path, task: StackTask) -> list[str]:
+    """Get the image references of a stack, with variables and overrides resolved by Docker Compose."""
+    stack_dir = DOCKER_STACKS_DIR / task.category
+    compose_files = get_compose_files(host_config_dir, stack_dir, task.name)
+    file_args = [arg for f in compose_files for arg in ["-f", str(f)]]
+    env_file_args = get_env_file_args(host_config_dir, task.name)
+    return docker_output(["compose", *file_args, *env_file_args, "config", "--images"]).split()
+
+
+def pull_image(pull: ImagePull, registry_limits: dict[str, threading.Semaphore]) -> ImagePull:
+    """Pull an image, recording its status, duration and size."""
+    with registry_limits[get_image_registry(pull.image)]:
+        start = time.monotonic()
+        try:
+            docker_output(["pull", "--quiet", pull.image])
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            pull.status = "failed"
+            details = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else e
+            logger.error(f"Failed to pull {pull.image}: {details}")  # noqa: TRY400
+        else:
+            pull.status = "ok"
+            pull.size = get_image_size(pull.image)
+            logger.info(f"Pulled {pull.image} in {time.monotonic() - start:.1f}s")
+        finally:
+            pull.duration = time.monotonic() - start
+    return pull
+
+
+def log_pull_summary(pulls: list[ImagePull], builds: list[StackResult], elapsed: float) -> None:
+    """Print per-image and per-build status, duration and size, followed by the totals."""
+    logger.info("")
+    logger.info(f"{'IMAGE':<70} {'STATUS':<8} {'TIME':>8} {'SIZE':>10}")
+    logger.info("-" * 99)
+    for pull in pulls:
+        logger.info(f"{pull.image:<70} {pull.status:<8} {pull.duration:>7.1f}s {format_size(pull.size):>10}")
+    for build in builds:
+        logger.info(f"{build.task.label + ' (build)':<70} {build.status:<8} {build.duration:>7.1f}s {'-':>10}")
+    logger.info("-" * 99)
+
+    pulled = [pull for pull in pulls if pull.status == "ok"]
+    total_size = sum(pull.size or 0 for pull in pulled)
+    logger.info(f"{len(pulled)}/{len(pulls)} images pulled ({format_size(total_size)}), {len(builds)} stacks built in {elapsed:.1f}s")
+
+
+def pull_stack_images(context: ApplyContext, tasks: list[StackTask]) -> set[str]:
+    """Pull the images of all stacks being (re)started before starting any of them.
+
+    Images shared by several stacks are pulled once, up to pull_jobs at a time (and MAX_PULLS_PER_REGISTRY per registry).
+    Stacks with a build directive are built with Bake instead, on the same pool.
+
+    Returns:
+        Labels of the stacks whose images could not be pulled or built
+    """
+    start = time.monotonic()
+    jobs = context.apply_options.pull_jobs
+    stacks = [task for task in tasks if task.action in {"up", "recreate"} and get_compose_file(DOCKER_STACKS_DIR / task.category, task.name).exists()]
+    build_stacks = [task for task in stacks if has_build_directive(get_compose_file(DOCKER_STACKS_DIR / task.category, task.name))]
+    image_stacks = [task for task in stacks if task not in build_stacks]
+
+    logger.info("")
+    logger.info(f">>> Pulling images of {len(image_stacks)} stacks, building {len(build_stacks)} stacks")
+
+    failed: set[str] = set()
+    pulls: dict[str, ImagePull] = {}
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="labctl-pull") as executor:
+        image_futures = {executor.submit(get_stack_images, context.host_config_dir, task): task for task in image_stacks}
+        build_futures = [executor.submit(run_stack_task, context, replace(task, action="pull"), True) for task in build_stacks]
+
+        for future in as_completed(image_futures):
+            task = image_futures[future]
+            try:
+                images = future.result()
+            except (subprocess.CalledProcessError, RuntimeError, OSError) as e:
+                logger.error(f"Failed to list the images of {task.label}: {e}")  # noqa: TRY400
+                failed.add(task.label)
+                continue
+            for image in images:
+                pulls.setdefault(image, ImagePull(image)).stacks.append(task.label)
+
+        registry_limits = {get_image_registry(image): threading.Semaphore(MAX_PULLS_PER_REGISTRY) for image in pulls}
+        pull_futures = [executor.submit(pull_image, pull, registry_limits) for pull in pulls.values()]
+
+        builds = [future.result() for future in build_futures]
+        for pull_future in pull_futures:
+            pull = pull_future.result()
+            if pull.status != "ok":
+                failed.update(pull.stacks)
+
+    for build in builds:
+        log_stack_output(build)
+        if build.status != "ok":
+            failed.add(build.task.label)
+
+    log_pull_summary(list(pulls.values()), builds, time.monotonic() - start)
+    return failed
+
+
 def build_log_command_flags(options: DockerOptions) -> list[str]:
     """Build Docker Compose log command flags based on options."""
     flags: list[str] = []
@@ -230,16 +1021,12 @@ def docker_command(
         return
 
     # Ensure external networks exist only when (re)starting containers
-    if action in {"up", "recreate"}:
+    if action in {"up", "recreate"} and options.ensure_networks:
         create_service_networks(compose_file)
 
-    compose_files = [compose_file]
-    suffix = get_gpu_suffix(host_config_dir)
-    if suffix:
-        override = compose_file.parent / f"{service_name}-{suffix}.yaml"
-        if override.exists():
-            logger.info(f"  GPU override: {override.name}")
-            compose_files.append(override)
+    compose_files = get_compose_files(host_config_dir, stack_dir, service_name)
+    for override in compose_files[1:]:
+        logger.info(f"  GPU override: {override.name}")
 
     env_file_args = get_env_file_args(host_config_dir, service_name)
     file_args = [arg for f in compose_files for arg in ["-f", str(f)]]
@@ -282,34 +1069,27 @@ def load_services_config(config_file: str | Path) -> dict:
     """Load services configuration from YAML file."""
     try:
         with open(config_file) as f:
-            return yaml.safe_load(f)
-    except (OSError, yaml.YAMLError):
+            return safe_load(f)
+    except (OSError, YAMLError):
         logger.exception(f"Error loading configuration file {config_file}")
         sys.exit(1)
 
 
-def process_services(
-    host_config_dir: Path,
-    config: dict,
-    state_override: str | None = None,
-    pull_before_start: bool = False,
-    quiet: bool = False,
-) -> None:
-    """Process services based on the configuration."""
+def collect_stack_tasks(config: dict, state_override: str | None = None) -> list[StackTask]:
+    """Collect the stack operations to perform from the services configuration, in configuration order."""
     if not isinstance(config, dict):
         logger.error("Error: Invalid configuration format. Config must be a dict.")
-        return
+        return []
 
     if "services" not in config:
         logger.error("Error: Invalid configuration format. 'services' key not found.")
-        return
+        return []
 
     if not isinstance(config["services"], list):
         logger.error("Error: Invalid configuration format. 'services' must be a list.")
-        return
-
-    options = DockerOptions(pull_before_start=pull_before_start, quiet=quiet)
+        return []
 
+    tasks: list[StackTask] = []
     for category_entry in config["services"]:
         # Each entry should have a single key (the category name) and a list of services
         if not isinstance(category_entry, dict) or len(category_entry) != 1:
@@ -339,7 +1119,431 @@ def process_services(
                 logger.warning(f"Unknown state '{state}' for service {category}/{name}")
                 continue
 
-            docker_command(host_config_dir, DOCKER_STACKS_DIR / category, name, state, options)
+            after = service.get("after") or []
+            if isinstance(after, str):
+                after = [after]
+            if not isinstance(after, list) or not all(isinstance(item, str) for item in after):
+                logger.warning(f"Ignoring invalid 'after' for service {category}/{name}: expected a list of category/name entries")
+                after = []
+
+            tasks.append(StackTask(category, name, state, after))
+
+    return tasks
+
+
+def build_dependency_graph(tasks: list[StackTask]) -> dict[str, set[str]]:
+    """Build the stack dependency graph, mapping each stack label to the labels of the stacks it depends on.
+
+    Edges come from:
+    - the optional `after:` list of the service in services.yaml
+    - `depends_on` entries referring to services defined in another stack
+    - shared external networks: the stack attached to the most external networks (i.e. Traefik) is treated as the
+      provider of every network it shares, and the other stacks on those networks depend on it.
+      Ties go to the stack listed first in the configuration. Network edges that would contradict
+      the explicit ones (e.g. `after: security/crowdsec` for Traefik) are left out.
+    """
+    graph: dict[str, set[str]] = {task.label: set() for task in tasks}
+    service_owners: dict[str, str] = {}
+    external_dependencies: dict[str, list[str]] = {}
+    network_members: dict[str, list[str]] = {}
+    network_counts: dict[str, int] = {}
+
+    for task in tasks:
+        for label in task.after:
+            if label in graph and label != task.label:
+                graph[task.label].add(label)
+            else:
+                logger.warning(f"Ignoring 'after: {label}' of {task.label}: not a configured service")
+
+        compose_file = get_compose_file(DOCKER_STACKS_DIR / task.category, task.name)
+        if not compose_file.exists():
+            continue
+
+        services = load_compose_services(compose_file)
+        for service_name in services:
+            service_owners.setdefault(service_name, task.label)
+        external_dependencies[task.label] = get_external_service_dependencies(services)
+
+        networks = get_external_networks(compose_file)
+        network_counts[task.label] = len(networks)
+        for network_name in networks:
+            network_members.setdefault(network_name, []).append(task.label)
+
+    for label, dependencies in external_dependencies.items():
+        for service_name in dependencies:
+            owner = service_owners.get(service_name)
+            if owner and owner != label:
+                graph[label].add(owner)
+
+    for members in network_members.values():
+        if len(members) < 2:
+            continue
+        # max() keeps the first of equal candidates, members are in configuration order
+        provider = max(members, key=lambda label: network_counts[label])
+        for label in members:
+            if label != provider and not _depends_on(graph, provider, label):
+                graph[label].add(provider)
+
+    return graph
+
+
+def _depends_on(graph: dict[str, set[str]], label: str, dependency: str) -> bool:
+    """Check whether a stack depends on another one, directly or transitively."""
+    seen: set[str] = set()
+    stack = [label]
+    while stack:
+        current = stack.pop()
+        if current == dependency:
+            return True
+        if current not in seen:
+            seen.add(current)
+            stack.extend(graph.get(current, ()))
+    return False
+
+
+def plan_waves(tasks: list[StackTask], graph: dict[str, set[str]]) -> tuple[list[list[StackTask]], dict[str, set[str]]]:
+    """Split the tasks into waves that can run in parallel, each wave only depending on earlier ones.
+
+    Starting operations process dependencies first, "down" processes dependents first,
+    other operations (pull, config, logs) are not ordered.
+
+    Returns:
+        Tuple of (waves, predecessors), predecessors mapping each stack label to the labels that must finish before it
+    """
+    by_label = {task.label: task for task in tasks}
+    predecessors: dict[str, set[str]] = {label: set() for label in by_label}
+    for task in tasks:
+        for dependency in graph.get(task.label, set()):
+            other = by_label[dependency]
+            if task.action in START_OPERATIONS and other.action in START_OPERATIONS:
+                predecessors[task.label].add(dependency)
+            elif task.action == "down" and other.action == "down":
+                predecessors[dependency].add(task.label)
+
+    waves: list[list[StackTask]] = []
+    done: set[str] = set()
+    remaining = list(by_label)
+    while remaining:
+        ready = [label for label in remaining if predecessors[label] <= done]
+        if not ready:
+            logger.warning(f"Dependency cycle between {', '.join(remaining)}: processing them in configuration order")
+            waves.extend([by_label[label]] for label in remaining)
+            break
+        waves.append([by_label[label] for label in ready])
+        done.update(ready)
+        remaining = [label for label in remaining if label not in done]
+
+    return waves, predecessors
+
+
+def run_stack_waves(context: ApplyContext, tasks: list[StackTask]) -> list[StackResult]:
+    """Run stack operations in dependency order, each wave on the worker pool.
+
+    Stacks depending on a failed (or skipped) stack are skipped.
+
+    Returns:
+        One result per task, in task order
+    """
+    waves, predecessors = plan_waves(tasks, build_dependency_graph(tasks))
+    results: dict[str, StackResult] = {task.label: StackResult(task) for task in tasks}
+    unavailable: set[str] = set()
+
+    for number, wave in enumerate(waves, start=1):
+        runnable = [task for task in wave if not predecessors[task.label] & unavailable]
+        unavailable.update(task.label for task in wave if task not in runnable)
+
+        logger.info("")
+        logger.info(f"--- Wave {number}/{len(waves)}: {', '.join(task.label for task in runnable) or 'nothing to do'}")
+        for result in run_stack_tasks(context, runnable):
+            results[result.task.label] = result
+            if result.status not in {"ok", "unchanged"}:
+                unavailable.add(result.task.label)
+
+        if context.apply_options.on_failure == "stop" and any(results[task.label].status == "failed" for task in runnable):
+            break
+
+    return [results[task.label] for task in tasks]
+
+
+def wait_until_ready(context: ApplyContext, task: StackTask, result: StackResult) -> None:
+    """Wait for the containers of a started stack to become running/healthy, recording the time it took.
+
+    Raises:
+        StackNotReadyError: If the containers are not ready within the wait timeout, or one of them failed.
+    """
+    if context.readiness is None:
+        return
+
+    compose_files = get_compose_files(context.host_config_dir, DOCKER_STACKS_DIR / task.category, task.name)
+    timeout = context.apply_options.wait_timeout
+    start = time.monotonic()
+    env_file_args = get_env_file_args(context.host_config_dir, task.name)
+    try:
+        ready = context.readiness.wait_ready(get_project_name(compose_files, env_file_args), timeout)
+    finally:
+        result.ready_time = time.monotonic() - start
+    if not ready:
+        raise StackNotReadyError(f"containers not ready after {timeout:.0f}s")
+    logger.info(f"  Ready after {result.ready_time:.1f}s")
+
+
+def run_stack_task(context: ApplyContext, task: StackTask, capture: bool = False) -> StackResult:
+    """Run a single stack operation and record its status and duration.
+
+    When capture is set, log messages and docker output are collected into the result instead of being printed.
+    With an apply state, "up" is skipped for stacks whose inputs are unchanged since their last start and whose containers are running.
+    With a readiness monitor, started stacks only succeed once all their containers are running/healthy.
+    """
+    result = StackResult(task)
+    if task.label in context.failed_pulls:
+        result.status = "failed"
+        logger.error(f"Not starting {task.label}: its images could not be pulled or built")
+        return result
+
+    if capture:
+        _stack_output.lines = result.output
+
+    start = time.monotonic()
+    try:
+        stack_dir = DOCKER_STACKS_DIR / task.category
+        fingerprint = None
+        if context.state is not None and get_compose_file(stack_dir, task.name).exists():
+            compose_files = get_compose_files(context.host_config_dir, stack_dir, task.name)
+            env_file_args = get_env_file_args(context.host_config_dir, task.name)
+            fingerprint = get_stack_fingerprint(compose_files, env_file_args)
+
+            if (
+                task.action == "up"
+                and not context.options.pull_before_start
+                and not context.pulled_images
+                and context.state.matches(task.label, fingerprint)
+                and is_stack_running(context.project_containers.get(get_project_name(compose_files, env_file_args), []))
+            ):
+                logger.info("")
+                logger.info(f">>> Unchanged {stack_dir}/{task.name}")
+                result.status = "unchanged"
+                return result
+
+        docker_command(context.host_config_dir, stack_dir, task.name, task.action, context.options)
+        if task.action in START_OPERATIONS and get_compose_file(stack_dir, task.name).exists():
+            wait_until_ready(context, task, result)
+    except (subprocess.CalledProcessError, RuntimeError, OSError, ValueError) as e:
+        result.status = "failed"
+        logger.error(f"Failed to {task.action} {task.label}: {e}")  # noqa: TRY400
+    else:
+        result.status = "ok"
+        if context.state is not None and task.action in {"up", "recreate", "down"}:
+            context.state.record(task.label, fingerprint if task.action != "down" else None)
+    finally:
+        result.duration = time.monotonic() - start
+        _stack_output.lines = None
+
+    return result
+
+
+def log_stack_output(result: StackResult) -> None:
+    """Print the captured output of a stack operation as one block."""
+    logger.info("")
+    logger.info(f"=== {result.task.label}: {result.task.action} {result.status} in {result.duration:.1f}s ===")
+    for line in result.output:
+        logger.info(line)
+
+
+def log_timing_summary(results: list[StackResult], elapsed: float) -> None:
+    """Print per-stack status and duration, followed by the totals."""
+    logger.info("")
+    logger.info(f"{'STACK':<40} {'ACTION':<10} {'STATUS':<9} {'TIME':>8} {'READY':>8}")
+    logger.info("-" * 79)
+    for result in results:
+        ready = f"{result.ready_time:.1f}s" if result.ready_time is not None else "-"
+        logger.info(f"{result.task.label:<40} {result.task.action:<10} {result.status:<9} {result.duration:>7.1f}s {ready:>8}")
+    logger.info("-" * 79)
+
+    counts = {status: sum(1 for r in results if r.status == status) for status in ("ok", "unchanged", "failed", "skipped")}
+    busy = sum(r.duration for r in results)
+    logger.info(
+        f"{counts['ok']} ok, {counts['unchanged']} unchanged, {counts['failed']} failed, {counts['skipped']} skipped in {elapsed:.1f}s (sum of stack times: {busy:.1f}s)"
+    )
+
+
+def run_stack_tasks(context: ApplyContext, tasks: list[StackTask]) -> list[StackResult]:
+    """Run stack operations, either one by one or on a pool of worker threads.
+
+    With more than one job, each stack's output is printed as one block when it finishes.
+    With the 'stop' failure policy no new stacks are started after the first failure, and the remaining ones are reported as skipped.
+
+    Returns:
+        One result per task, in task order
+    """
+    results: list[StackResult] = [StackResult(task) for task in tasks]
+    stop_on_failure = context.apply_options.on_failure == "stop"
+
+    if context.apply_options.jobs <= 1:
+        for index, task in enumerate(tasks):
+            results[index] = run_stack_task(context, task)
+            if results[index].status == "failed" and stop_on_failure:
+                break
+        return results
+
+    with ThreadPoolExecutor(max_workers=context.apply_options.jobs, thread_name_prefix="labctl") as executor:
+        futures = {executor.submit(run_stack_task, context, task, True): index for index, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result = future.result()
+            results[futures[future]] = result
+            log_stack_output(result)
+            if result.status == "failed" and stop_on_failure:
+                for pending in futures:
+                    pending.cancel()
+
+    return results
+
+
+def process_services(
+    host_config_dir: Path,
+    config: dict,
+    state_override: str | None = None,
+    options: DockerOptions | None = None,
+    apply_options: ApplyOptions | None = None,
+) -> list[StackResult]:
+    """Process services based on the configuration.
+
+    Returns:
+        Results of the stack operations, in configuration order
+    """
+    if options is None:
+        options = DockerOptions()
+    if apply_options is None:
+        apply_options = ApplyOptions()
+
+    tasks = collect_stack_tasks(config, state_override)
+    if provision_networks(tasks):
+        options = replace(options, ensure_networks=False)
+
+    context = ApplyContext(host_config_dir, options, apply_options)
+    if apply_options.skip_unchanged:
+        context.state = ApplyState(APPLY_STATE_DIR / f"{host_config_dir.name}.json")
+        if not options.pull_before_start:
+            try:
+                context.project_containers = list_compose_containers()
+            except (subprocess.CalledProcessError, RuntimeError) as e:
+                logger.warning(f"Error listing containers, starting all services: {e}")
+    if apply_options.wait:
+        context.readiness = ReadinessMonitor()
+
+    start = time.monotonic()
+    if options.pull_before_start:
+        context.failed_pulls = pull_stack_images(context, tasks)
+        context.pulled_images = True
+        context.options = replace(options, pull_before_start=False)
+
+    run = run_stack_waves if apply_options.order == "deps" else run_stack_tasks
+    try:
+        results = run(context, tasks)
+    finally:
+        if context.readiness is not None:
+            context.readiness.stop()
+
+    if context.state is not None:
+        context.state.save()
+
+    if apply_options.jobs > 1 or apply_options.wait:
+        log_timing_summary(results, time.monotonic() - start)
+    logger.info(
+        f"Compose cache: {compose_cache.reads} files read, {compose_cache.parses} parsed ({YAML_BACKEND} parser), {compose_cache.hits} cache hits"
+    )
+
+    return results
+
+
+def resolve_log_targets(targets: list[str]) -> list[StackTask]:
+    """Resolve services (category/name) and categories (all services below them) to log targets."""
+    tasks: list[StackTask] = []
+    for target in targets:
+        target_path = target.strip("/")
+        category, _, name = target_path.rpartition("/")
+        if category and get_compose_file(DOCKER_STACKS_DIR / category, name).exists():
+            tasks.append(StackTask(category, name, "logs"))
+            continue
+
+        category_dir = DOCKER_STACKS_DIR / target_path
+        services = sorted(path.parent for path in category_dir.rglob("*.yaml") if path.stem == path.parent.name) if category_dir.is_dir() else []
+        if not services:
+            logger.warning(f"No services found for {target}")
+        for service_dir in services:
+            tasks.append(StackTask(str(service_dir.parent.relative_to(DOCKER_STACKS_DIR)), service_dir.name, "logs"))
+
+    return list({task.label: task for task in tasks}.values())
+
+
+def read_stack_logs(
+    process: subprocess.Popen,
+    task: StackTask,
+    pattern: re.Pattern | None,
+    lines: queue.Queue,
+) -> None:
+    """Forward the (matching) log lines of a stack to the output queue, followed by a None end marker."""
+    try:
+        for line in process.stdout:
+            text = line.rstrip("\n")
+            if pattern is None or pattern.search(text):
+                lines.put((task, text))
+    finally:
+        lines.put((task, None))
+
+
+def format_log_line(label: str, text: str, width: int, color: str | None, as_json: bool) -> str:
+    """Format a log line with its stack prefix (padded to width), or as a JSON object."""
+    if as_json:
+        container, separator, message = text.partition(" | ")
+        entry = {"stack": label, "container": container.strip(), "message": message} if separator else {"stack": label, "message": text}
+        return json.dumps(entry, ensure_ascii=False)
+    if color:
+        return f"{color}{label:<{width}}\033[0m | {text}"
+    return f"{label:<{width}} | {text}"
+
+
+def stream_logs(tasks: list[StackTask], options: DockerOptions, pattern: re.Pattern | None = None, as_json: bool = False, color: bool = True) -> None:
+    """Stream the logs of several stacks concurrently into one output, each line prefixed with its stack.
+
+    One `docker compose logs` process per stack is read by its own thread; memory is bounded by LOG_QUEUE_SIZE lines.
+    """
+    host_config_dir = get_host_config_dir()
+    docker_bin = _get_docker_executable()
+    lines: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    width = max((len(task.label) for task in tasks), default=0)
+    colors = {task.label: LOG_PREFIX_COLORS[index % len(LOG_PREFIX_COLORS)] if color else None for index, task in enumerate(tasks)}
+
+    processes: list[subprocess.Popen] = []
+    try:
+        for task in tasks:
+            compose_files = get_compose_files(host_config_dir, DOCKER_STACKS_DIR / task.category, task.name)
+            file_args = [arg for f in compose_files for arg in ["-f", str(f)]]
+            cmd = ["compose", *file_args, *get_env_file_args(host_config_dir, task.name), "logs", "--no-color", *build_log_command_flags(options)]
+            process = subprocess.Popen(  # noqa: S603
+                [docker_bin, *cmd],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+            )
+            processes.append(process)
+            threading.Thread(target=read_stack_logs, args=(process, task, pattern, lines), daemon=True).start()
+
+        running = len(processes)
+        while running:
+            task, text = lines.get()
+            if text is None:
+                running -= 1
+                continue
+            print(format_log_line(task.label, text, width, colors[task.label], as_json), flush=True)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
 
 
 def get_host_config_dir() -> Path:
@@ -362,7 +1566,19 @@ def cmd_config_apply(args: argparse.Namespace) -> None:
     logger.info("Init...")
     config = load_services_config(config_file)
     create_localhost_link(host_config_dir.parent)
-    process_services(host_config_dir, config, args.mode, args.pull_before_start, args.quiet)
+    options = DockerOptions(pull_before_start=args.pull_before_start, quiet=args.quiet)
+    apply_options = ApplyOptions(
+        jobs=args.jobs,
+        on_failure=args.on_failure,
+        order=args.order,
+        skip_unchanged=args.skip_unchanged,
+        pull_jobs=args.pull_jobs,
+        wait=args.wait,
+        wait_timeout=args.wait_timeout,
+    )
+    results = process_services(host_config_dir, config, args.mode, options, apply_options)
+    if any(result.status == "failed" for result in results):
+        sys.exit(1)
 
 
 def cmd_service(args: argparse.Namespace) -> None:
@@ -391,9 +1607,36 @@ def cmd_service(args: argparse.Namespace) -> None:
     docker_command(get_host_config_dir(), DOCKER_STACKS_DIR / category_path, service_name, args.operation, options)
 
 
+def cmd_logs(args: argparse.Namespace) -> None:
+    """Stream the logs of several services or categories."""
+    tasks = resolve_log_targets(args.targets)
+    if not tasks:
+        logger.error("No services to show logs for")
+        sys.exit(1)
+
+    try:
+        pattern = re.compile(args.grep) if args.grep else None
+    except re.error as e:
+        logger.error(f"Invalid --grep pattern: {e}")  # noqa: TRY400
+        sys.exit(1)
+
+    options = DockerOptions(follow=args.follow, tail=args.tail, since=args.since, timestamps=args.timestamps)
+    color = not args.no_color and not args.json and sys.stdout.isatty()
+    try:
+        stream_logs(tasks, options, pattern, args.json, color)
+    except BrokenPipeError:
+        # Output closed by the consumer (e.g. piped into head): avoid another error when Python flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
 def main() -> None:
     """Main entry point for the Docker services management CLI."""
     parser = argparse.ArgumentParser(description="Manage Docker services using YAML configuration.")
+    parser.add_argument(
+        "--engine-api",
+        action="store_true",
+        help="Query networks and containers through the Docker Engine API socket instead of the docker CLI",
+    )
     subparsers = parser.add_subparsers(dest="command", help="Commands", required=True)
 
     # Config command with apply subcommand
@@ -404,7 +1647,42 @@ def main() -> None:
     config_apply_parser.add_argument("--config", "-c", help="Path to the YAML configuration file")
     config_apply_parser.add_argument("--mode", "-m", choices=list(ALLOWED_OPERATIONS), help="Override state for all services")
     config_apply_parser.add_argument("--pull-before-start", action="store_true", help="Pull images before starting services")
+    config_apply_parser.add_argument(
+        "--pull-jobs",
+        type=int,
+        default=4,
+        help="Number of images to pull in parallel with --pull-before-start (default: 4)",
+    )
     config_apply_parser.add_argument("--quiet", action="store_true", help="Use quiet mode for docker operations")
+    config_apply_parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of services to process in parallel (default: 1)")
+    config_apply_parser.add_argument(
+        "--on-failure",
+        choices=list(FAILURE_POLICIES),
+        default="stop",
+        help="Stop starting new services after a failure, or continue with the rest (default: stop)",
+    )
+    config_apply_parser.add_argument(
+        "--order",
+        choices=list(APPLY_ORDERS),
+        default="config",
+        help="Process services in configuration order, or in waves of their dependencies (default: config)",
+    )
+    config_apply_parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Skip starting running services whose compose and .env files are unchanged since their last start",
+    )
+    config_apply_parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wait for the containers of each started service to be running/healthy before it counts as done",
+    )
+    config_apply_parser.add_argument(
+        "--wait-timeout",
+        type=float,
+        default=300,
+        help="Seconds to wait for a service to become ready with --wait (default: 300)",
+    )
 
     # Service command
     service_parser = subparsers.add_parser("service", help="Manage individual services")
@@ -418,13 +1696,42 @@ def main() -> None:
     service_parser.add_argument("--since", "-s", help='Show logs since timestamp (e.g., "10m" for last 10 minutes)')
     service_parser.add_argument("--timestamps", "-t", action="store_true", help="Show timestamps with log entries")
 
+    # Logs command
+    logs_parser = subparsers.add_parser("logs", help="Stream the logs of several services at once")
+    logs_parser.add_argument("targets", nargs="+", help="Services (category/name) or categories (e.g. media/video) to show logs for")
+    logs_parser.add_argument("--follow", "-f", action="store_true", help="Follow log output (like tail -f)")
+    logs_parser.add_argument("--tail", "-n", default="all", help="Number of lines to show from the end of logs per service (default: all)")
+    logs_parser.add_argument("--since", "-s", help='Show logs since timestamp (e.g., "10m" for last 10 minutes)')
+    logs_parser.add_argument("--timestamps", "-t", action="store_true", help="Show timestamps with log entries")
+    logs_parser.add_argument("--grep", "-g", help="Only show lines matching this regular expression")
+    logs_parser.add_argument("--json", action="store_true", help="Write JSON lines with stack, container and message fields")
+    logs_parser.add_argument("--no-color", action="store_true", help="Do not color the service prefixes")
+
     args = parser.parse_args()
 
+    if getattr(args, "jobs", 1) < 1:
+        parser.error("--jobs must be at least 1")
+    if getattr(args, "pull_jobs", 1) < 1:
+        parser.error("--pull-jobs must be at least 1")
+
+    if args.engine_api:
+        global engine_client  # noqa: PLW0603
+        if DOCKER_SOCKET is None:
+            logger.warning("--engine-api requires a Unix socket DOCKER_HOST (unix://), using the docker CLI")
+        else:
+            client = DockerEngineClient(DOCKER_SOCKET)
+            if client.ping():
+                engine_client = client
+            else:
+                logger.warning(f"Docker Engine API not reachable at {client.socket_path}, using the docker CLI")
+
     match args.command:
         case "config" if args.config_command == "apply":
             cmd_config_apply(args)
         case "service":
             cmd_service(args)
+        case "logs":
+            cmd_logs(args)
         case _:
             parser.print_help()
 
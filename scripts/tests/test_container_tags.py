@@ -0,0 +1,27 @@
+"""Tests of the Docker Hub query planning of the infra-mcp container tag finder."""
+
+import pytest
+from infra_mcp.tools.get_container_tags import _DockerHubQuery, _plan_docker_hub_query
+from infra_mcp.utils.constants import DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT
+
+
+@pytest.mark.parametrize(
+    ("sort_by", "limit", "expected"),
+    [
+        ("updated", 10, _DockerHubQuery("last_updated", 10, 10)),
+        ("default", 10, _DockerHubQuery(None, 10, 10)),
+        ("updated", 250, _DockerHubQuery("last_updated", DOCKER_HUB_PAGE_SIZE, 250)),
+        ("version", 10, _DockerHubQuery(None, DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT)),
+        ("updated", None, _DockerHubQuery("last_updated", DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT)),
+        ("updated", 0, _DockerHubQuery("last_updated", DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT)),
+        ("default", -5, _DockerHubQuery(None, DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT)),
+    ],
+)
+def test_plan_docker_hub_query(sort_by: str, limit: int | None, expected: _DockerHubQuery) -> None:
+    assert _plan_docker_hub_query(sort_by, limit) == expected
+
+
+def test_plan_docker_hub_query_for_tag() -> None:
+    query = _plan_docker_hub_query("updated", 10, tag_name="1.27")
+    assert query == _DockerHubQuery(None, DOCKER_HUB_PAGE_SIZE, MAX_TAGS_FETCH_LIMIT, "1.27")
+    assert query.params == {"page_size": DOCKER_HUB_PAGE_SIZE, "name": "1.27"}
@@ -0,0 +1,159 @@
+"""Tests of the infra-mcp HTTP session and response cache against a stub server."""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from infra_mcp.utils import http
+from infra_mcp.utils.http import CachedSession, PooledSession, ResponseCache, parse_cache_control
+
+TAGS = "v2/app/tags/list"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /<name> with the Cache-Control header, status and headers set for <name> on the server."""
+
+    server: "StubServer"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.requests.append((self.path, self.headers.get("Authorization")))
+        name = self.path.lstrip("/")
+        body = json.dumps({"name": name, "request": len(self.server.requests)}).encode()
+        self.send_response(self.server.statuses.get(name, 200))
+        if name in self.server.cache_control:
+            self.send_header("Cache-Control", self.server.cache_control[name])
+        for header, value in self.server.headers.get(name, {}).items():
+            self.send_header(header, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server recording the paths and Authorization headers it was requested with."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.requests: list[tuple[str, str | None]] = []
+        self.cache_control: dict[str, str] = {}
+        self.statuses: dict[str, int] = {}
+        self.headers: dict[str, dict[str, str]] = {}
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}/{name}"
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for_requests(server: StubServer, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(server.requests) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_parse_cache_control() -> None:
+    assert parse_cache_control('Private, max-age="60", no-transform') == {"private": None, "max-age": "60", "no-transform": None}
+    assert parse_cache_control("") == {}
+
+
+def test_fresh_responses_are_served_from_cache(server: StubServer) -> None:
+    session = CachedSession(ResponseCache(ttl=60))
+    first = session.get(server.url(TAGS)).json()
+    assert session.get(server.url(TAGS)).json() == first
+    assert len(server.requests) == 1
+
+
+@pytest.mark.parametrize("path", ["index.html", "v2/app/blobs/sha256:abc"])
+def test_only_registry_listings_and_manifests_are_cached(server: StubServer, path: str) -> None:
+    session = CachedSession(ResponseCache(ttl=60))
+    session.get(server.url(path))
+    session.get(server.url(path))
+    session.get(server.url("v2/repositories/library/nginx/tags?page_size=100"))
+    session.get(server.url("v2/repositories/library/nginx/tags?page_size=100"))
+    session.get(server.url("v2/app/manifests/1.0"))
+    session.get(server.url("v2/app/manifests/1.0"))
+    assert [request for request, _ in server.requests] == [
+        f"/{path}",
+        f"/{path}",
+        "/v2/repositories/library/nginx/tags?page_size=100",
+        "/v2/app/manifests/1.0",
+    ]
+
+
+def test_authorized_and_anonymous_responses_are_kept_apart(server: StubServer) -> None:
+    session = CachedSession(ResponseCache(ttl=60))
+    session.get(server.url(TAGS))
+    session.get(server.url(TAGS), headers={"Authorization": "Bearer one"})
+    session.get(server.url(TAGS), headers={"Authorization": "Bearer two"})
+    session.get(server.url(TAGS))
+    assert server.requests == [(f"/{TAGS}", None), (f"/{TAGS}", "Bearer one")]
+
+
+@pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=60"])
+def test_uncacheable_responses_are_not_stored(server: StubServer, cache_control: str) -> None:
+    server.cache_control[TAGS] = cache_control
+    session = CachedSession(ResponseCache(ttl=60))
+    session.get(server.url(TAGS))
+    session.get(server.url(TAGS))
+    assert len(server.requests) == 2
+
+
+def test_max_age_shortens_fresh_time(server: StubServer) -> None:
+    server.cache_control[TAGS] = "max-age=0"
+    session = CachedSession(ResponseCache(ttl=60, stale_ttl=0))
+    session.get(server.url(TAGS))
+    time.sleep(0.01)
+    session.get(server.url(TAGS))
+    assert len(server.requests) == 2
+
+
+def test_authorized_requests_are_not_served_stale(server: StubServer) -> None:
+    session = CachedSession(ResponseCache(ttl=0, stale_ttl=60))
+    session.get(server.url(TAGS), headers={"Authorization": "Bearer old"})
+    time.sleep(0.01)
+    response = session.get(server.url(TAGS), headers={"Authorization": "Bearer new"})
+    assert response.json()["request"] == 2
+    assert server.requests == [(f"/{TAGS}", "Bearer old"), (f"/{TAGS}", "Bearer new")]
+
+
+def test_entry_removed_when_revalidation_is_denied(server: StubServer) -> None:
+    cache = ResponseCache(ttl=0, stale_ttl=60)
+    session = CachedSession(cache)
+    session.get(server.url(TAGS))
+    server.statuses[TAGS] = 401
+    time.sleep(0.01)
+
+    # Served stale while revalidated in the background
+    assert session.get(server.url(TAGS)).status_code == 200
+    wait_for_requests(server, 2)
+    session._revalidation_executor.shutdown(wait=True)
+    assert cache.get(f"{server.url(TAGS)}\n*/*\nanonymous") is None
+
+
+def test_retry_after_delay_is_capped(server: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http, "HTTP_RETRY_AFTER_MAX", 0.1)
+    server.statuses[TAGS] = 503
+    server.headers[TAGS] = {"Retry-After": "3600"}
+
+    start = time.monotonic()
+    response = PooledSession(max_retries=2).get(server.url(TAGS))
+    assert response.status_code == 503
+    assert len(server.requests) == 3
+    assert time.monotonic() - start < 5
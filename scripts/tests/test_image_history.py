@@ -0,0 +1,137 @@
+"""Tests of the image history index against git blame on a temporary repository."""
+
+import os
+import re
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from utils.git_utils import BlameCache
+from utils.image_history import ImageHistoryIndex
+
+COMPOSE_FILE = "docker/apps/wiki/wiki.yaml"
+
+BASE = """services:
+  wiki:
+    image: wiki:1.0
+    restart: unless-stopped
+  db:
+    image: postgres:16
+    environment:
+      TZ: UTC
+  cache:
+    image: redis:7
+"""
+
+
+def git(repo: Path, *args: str, day: int = 1) -> None:
+    date = f"2024-01-{day:02d}T12:00:00+00:00"
+    env = os.environ | {
+        "GIT_AUTHOR_NAME": "Test",
+        "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_AUTHOR_DATE": date,
+        "GIT_COMMITTER_NAME": "Test",
+        "GIT_COMMITTER_EMAIL": "test@example.com",
+        "GIT_COMMITTER_DATE": date,
+    }
+    subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True)  # noqa: S603, S607
+
+
+def write(repo: Path, path: str, content: str) -> None:
+    (repo / path).parent.mkdir(parents=True, exist_ok=True)
+    (repo / path).write_text(content)
+
+
+def commit(repo: Path, path: str, content: str, day: int) -> None:
+    write(repo, path, content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", f"Day {day}", day=day)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q")
+    commit(tmp_path, COMPOSE_FILE, BASE, day=1)
+    # A file outside the docker directory is not indexed
+    commit(tmp_path, "README.md", "image: ignored:1\n", day=2)
+    return tmp_path
+
+
+def insert_service(repo: Path) -> None:
+    commit(repo, COMPOSE_FILE, BASE.replace("services:\n", "services:\n  proxy:\n    image: traefik:v3\n"), day=3)
+
+
+def delete_service(repo: Path) -> None:
+    commit(repo, COMPOSE_FILE, BASE.replace("  wiki:\n    image: wiki:1.0\n    restart: unless-stopped\n", ""), day=3)
+
+
+def replace_images(repo: Path) -> None:
+    commit(repo, COMPOSE_FILE, BASE.replace("postgres:16", "postgres:17").replace("redis:7", "valkey:8"), day=3)
+    # A change next to an image line leaves it as it was
+    commit(repo, COMPOSE_FILE, BASE.replace("postgres:16", "postgres:17").replace("redis:7", "valkey:8").replace("TZ: UTC", "TZ: CET"), day=4)
+
+
+def rename_file(repo: Path) -> None:
+    git(repo, "mv", "docker/apps/wiki", "docker/apps/docs")
+    git(repo, "mv", "docker/apps/docs/wiki.yaml", "docker/apps/docs/docs.yaml")
+    write(repo, "docker/apps/docs/docs.yaml", BASE.replace("wiki:1.0", "docs:2.0"))
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "Rename", day=3)
+    commit(repo, "docker/apps/docs/docs.yaml", BASE.replace("wiki:1.0", "docs:2.0") + "  worker:\n    image: docs-worker:2.0\n", day=4)
+
+
+def uncommitted_changes(repo: Path) -> None:
+    insert_service(repo)
+    changed = BASE.replace("services:\n", "services:\n  proxy:\n    image: traefik:v3\n  new:\n    image: new:1\n").replace("redis:7", "redis:8")
+    write(repo, COMPOSE_FILE, changed)
+    write(repo, "docker/apps/blog/blog.yaml", "services:\n  blog:\n    image: ghost:5\n")
+
+
+def get_image_lines(repo: Path) -> dict[str, list[int]]:
+    """Find the image lines of the compose files of the working tree."""
+    image_lines = {}
+    for path in sorted((repo / "docker").rglob("*.yaml")):
+        lines = path.read_text().splitlines()
+        image_lines[path.relative_to(repo).as_posix()] = [number for number, line in enumerate(lines, 1) if re.match(r"\s*image:", line)]
+    return image_lines
+
+
+@pytest.mark.parametrize("change", [insert_service, delete_service, replace_images, rename_file, uncommitted_changes])
+def test_index_agrees_with_blame(repo: Path, change: Callable[[Path], None]) -> None:
+    change(repo)
+    index = ImageHistoryIndex(repo)
+    index.build()
+    blame_cache = BlameCache(repo, ".cache/blame.json")
+
+    dates = set()
+    for file_path, line_numbers in get_image_lines(repo).items():
+        blamed = blame_cache.get_lines_last_changed(file_path, line_numbers)
+        assert index.get_lines_last_changed(file_path, line_numbers) == blamed, file_path
+        dates.update(blamed.values())
+
+    # Only the uncommitted lines are undated, blame did not fail
+    assert dates - {None}
+    assert (None in dates) == (change is uncommitted_changes)
+
+    # Dates served from the saved cache agree as well
+    blame_cache.save()
+    cached = BlameCache(repo, ".cache/blame.json")
+    for file_path, line_numbers in get_image_lines(repo).items():
+        assert cached.get_lines_last_changed(file_path, line_numbers) == index.get_lines_last_changed(file_path, line_numbers)
+
+
+def test_image_history(repo: Path) -> None:
+    replace_images(repo)
+    index = ImageHistoryIndex(repo)
+    index.build()
+
+    changes = [(change.line, change.old_image, change.new_image) for change in index.get_image_history(COMPOSE_FILE)]
+    assert changes == [
+        (3, None, "wiki:1.0"),
+        (6, None, "postgres:16"),
+        (10, None, "redis:7"),
+        (6, "postgres:16", "postgres:17"),
+        (10, "redis:7", "valkey:8"),
+    ]
@@ -0,0 +1,201 @@
+"""Tests of the labctl config apply planning: dependency graph, waves, stack fingerprints, apply state and readiness."""
+
+import time
+from pathlib import Path
+
+import labctl
+import pytest
+from labctl import ApplyState, StackTask
+
+
+@pytest.fixture
+def stacks_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    stacks_dir = tmp_path / "docker"
+    monkeypatch.setattr(labctl, "DOCKER_STACKS_DIR", stacks_dir)
+    return stacks_dir
+
+
+def write_stack(stacks_dir: Path, label: str, content: str) -> Path:
+    category, name = label.rsplit("/", 1)
+    compose_file = labctl.get_compose_file(stacks_dir / category, name)
+    compose_file.parent.mkdir(parents=True, exist_ok=True)
+    compose_file.write_text(content)
+    return compose_file
+
+
+def labels(waves: list[list[StackTask]]) -> list[list[str]]:
+    return [[task.label for task in wave] for wave in waves]
+
+
+PROXY = """
+services:
+  traefik:
+    image: traefik:v3
+networks:
+  proxy:
+    external: true
+  socket:
+    external: {name: socket-proxy}
+"""
+
+APP = """
+services:
+  app:
+    image: app:1
+    depends_on:
+      crowdsec:
+        condition: service_started
+        required: false
+networks:
+  proxy:
+    external: true
+"""
+
+
+def test_collect_stack_tasks() -> None:
+    config = {
+        "services": [
+            {"security": [{"name": "traefik"}, {"name": "crowdsec", "after": "security/traefik"}]},
+            {"apps": [{"name": "wiki", "state": "down", "after": [1]}, {"name": "bad", "state": "sideways"}, {"state": "up"}]},
+        ]
+    }
+    tasks = labctl.collect_stack_tasks(config)
+    assert tasks == [
+        StackTask("security", "traefik", "up"),
+        StackTask("security", "crowdsec", "up", ["security/traefik"]),
+        StackTask("apps", "wiki", "down"),
+    ]
+    assert [task.action for task in labctl.collect_stack_tasks(config, "pull")] == ["pull", "pull", "pull", "pull"]
+
+
+def test_dependency_graph_from_after(stacks_dir: Path) -> None:
+    tasks = [
+        StackTask("db", "postgres", "up"),
+        StackTask("apps", "wiki", "up", ["db/postgres", "db/missing", "apps/wiki"]),
+    ]
+    assert labctl.build_dependency_graph(tasks) == {"db/postgres": set(), "apps/wiki": {"db/postgres"}}
+
+
+def test_dependency_graph_from_depends_on_and_networks(stacks_dir: Path) -> None:
+    write_stack(stacks_dir, "security/traefik", PROXY)
+    write_stack(stacks_dir, "security/crowdsec", "services:\n  crowdsec:\n    image: crowdsec:1\n")
+    write_stack(stacks_dir, "apps/wiki", APP)
+    tasks = [StackTask("apps", "wiki", "up"), StackTask("security", "traefik", "up"), StackTask("security", "crowdsec", "up")]
+
+    # wiki depends on the crowdsec service of another stack, and on traefik, the provider of the shared proxy network
+    assert labctl.build_dependency_graph(tasks) == {
+        "apps/wiki": {"security/traefik", "security/crowdsec"},
+        "security/traefik": set(),
+        "security/crowdsec": set(),
+    }
+
+
+def test_network_edges_do_not_contradict_after(stacks_dir: Path) -> None:
+    write_stack(stacks_dir, "security/traefik", PROXY)
+    write_stack(stacks_dir, "apps/wiki", APP)
+    tasks = [StackTask("security", "traefik", "up", ["apps/wiki"]), StackTask("apps", "wiki", "up")]
+    assert labctl.build_dependency_graph(tasks) == {"security/traefik": {"apps/wiki"}, "apps/wiki": set()}
+
+
+def test_plan_waves_starts_dependencies_first() -> None:
+    tasks = [StackTask("apps", "wiki", "up"), StackTask("db", "postgres", "up"), StackTask("security", "traefik", "recreate")]
+    graph = {"apps/wiki": {"db/postgres", "security/traefik"}, "db/postgres": set(), "security/traefik": set()}
+
+    waves, predecessors = labctl.plan_waves(tasks, graph)
+    assert labels(waves) == [["db/postgres", "security/traefik"], ["apps/wiki"]]
+    assert predecessors["apps/wiki"] == {"db/postgres", "security/traefik"}
+
+
+def test_plan_waves_stops_dependents_first() -> None:
+    tasks = [StackTask("db", "postgres", "down"), StackTask("apps", "wiki", "down")]
+    waves, _ = labctl.plan_waves(tasks, {"apps/wiki": {"db/postgres"}, "db/postgres": set()})
+    assert labels(waves) == [["apps/wiki"], ["db/postgres"]]
+
+
+def test_plan_waves_does_not_order_mixed_or_other_operations() -> None:
+    tasks = [StackTask("apps", "wiki", "up"), StackTask("db", "postgres", "down"), StackTask("apps", "blog", "pull")]
+    graph = {"apps/wiki": {"db/postgres"}, "db/postgres": set(), "apps/blog": {"apps/wiki"}}
+    waves, _ = labctl.plan_waves(tasks, graph)
+    assert labels(waves) == [["apps/wiki", "db/postgres", "apps/blog"]]
+
+
+def test_plan_waves_with_cycle_falls_back_to_configuration_order(caplog: pytest.LogCaptureFixture) -> None:
+    tasks = [StackTask("a", "one", "up"), StackTask("a", "two", "up"), StackTask("a", "three", "up")]
+    graph = {"a/one": set(), "a/two": {"a/three"}, "a/three": {"a/two"}}
+    waves, _ = labctl.plan_waves(tasks, graph)
+    assert labels(waves) == [["a/one"], ["a/two"], ["a/three"]]
+    assert "Dependency cycle between a/two, a/three" in caplog.text
+
+
+def test_stack_fingerprint_covers_stack_inputs(tmp_path: Path) -> None:
+    stack_dir = tmp_path / "apps" / "wiki"
+    (stack_dir / "build").mkdir(parents=True)
+    compose_file = stack_dir / "wiki.yaml"
+    compose_file.write_text("include:\n  - common.yaml\nservices:\n  wiki:\n    build: build\n")
+    (stack_dir / "common.yaml").write_text("services:\n  redis:\n    image: redis:7\n")
+    env_file = tmp_path / ".env"
+    env_file.write_text("TZ=UTC\n")
+    env_file_args = ["--env-file", str(env_file)]
+
+    fingerprints = [labctl.get_stack_fingerprint([compose_file], env_file_args)]
+    assert labctl.get_stack_fingerprint([compose_file], env_file_args) == fingerprints[0]
+
+    env_file.write_text("TZ=Europe/Berlin\n")
+    fingerprints.append(labctl.get_stack_fingerprint([compose_file], env_file_args))
+    (stack_dir / "common.yaml").write_text("services:\n  redis:\n    image: redis:8\n")
+    fingerprints.append(labctl.get_stack_fingerprint([compose_file], env_file_args))
+    (stack_dir / "build" / "Dockerfile").write_text("FROM alpine\n")
+    fingerprints.append(labctl.get_stack_fingerprint([compose_file], env_file_args))
+    assert len(set(fingerprints)) == 4
+
+
+def test_apply_state_round_trip(tmp_path: Path) -> None:
+    state_file = tmp_path / "state" / "host.json"
+    state = ApplyState(state_file)
+    state.record("apps/wiki", "abc")
+    state.record("db/postgres", "def")
+    state.record("db/postgres", None)
+    state.save()
+
+    loaded = ApplyState(state_file)
+    assert loaded.fingerprints == {"apps/wiki": "abc"}
+    assert loaded.matches("apps/wiki", "abc")
+    assert not loaded.matches("apps/wiki", "other")
+    assert not loaded.matches("db/postgres", "def")
+
+
+def test_apply_state_ignores_unreadable_file(tmp_path: Path) -> None:
+    state_file = tmp_path / "host.json"
+    state_file.write_text("{not json")
+    assert ApplyState(state_file).fingerprints == {}
+
+
+@pytest.mark.parametrize("containers", [[("running", "Up 1 minute"), ("exited", "Exited (0) 10 seconds ago")], []])
+def test_wait_ready(monkeypatch: pytest.MonkeyPatch, containers: list[tuple[str, str]]) -> None:
+    monkeypatch.setattr(labctl, "list_compose_containers", lambda: {"wiki": containers})
+    monitor = labctl.ReadinessMonitor()
+    try:
+        assert monitor.wait_ready("wiki", 5)
+    finally:
+        monitor.stop()
+
+
+def test_wait_ready_times_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(labctl, "list_compose_containers", lambda: {"wiki": [("running", "Up 1 second (health: starting)")]})
+    monitor = labctl.ReadinessMonitor()
+    try:
+        assert not monitor.wait_ready("wiki", 0.2)
+    finally:
+        monitor.stop()
+
+
+def test_wait_ready_fails_at_once_when_a_container_exits(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(labctl, "list_compose_containers", lambda: {"wiki": [("running", "Up 1 minute"), ("exited", "Exited (1) 1 second ago")]})
+    monitor = labctl.ReadinessMonitor()
+    start = time.monotonic()
+    try:
+        with pytest.raises(labctl.StackNotReadyError, match=r"Exited \(1\)"):
+            monitor.wait_ready("wiki", 60)
+    finally:
+        monitor.stop()
+    assert time.monotonic() - start < 5
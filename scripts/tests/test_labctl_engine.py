@@ -0,0 +1,133 @@
+"""Tests of the labctl Docker Engine API client against a fake daemon socket."""
+
+import json
+import socketserver
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import labctl
+import pytest
+
+
+class FakeDaemonHandler(BaseHTTPRequestHandler):
+    """Answers the Engine API endpoints used by labctl."""
+
+    protocol_version = "HTTP/1.1"
+    server: "FakeDaemon"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close the connection without telling the client, like a daemon dropping an idle keep-alive connection
+        self.close_connection = self.server.close_after_response
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        if url.path == "/_ping":
+            self._send(200, b"OK", "text/plain; charset=utf-8")
+        elif url.path == "/networks":
+            self._send(200, json.dumps([{"Name": name} for name in self.server.networks]).encode())
+        elif url.path.startswith("/networks/"):
+            self._send(200 if url.path.removeprefix("/networks/") in self.server.networks else 404, b"{}")
+        elif url.path == "/containers/json":
+            self.server.container_filters.append(json.loads(parse_qs(url.query)["filters"][0]))
+            self._send(200, json.dumps([{"State": "running", "Status": "Up 1 minute", "Labels": {}}]).encode())
+        else:
+            self._send(404, b'{"message": "not found"}')
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.created_networks.append(body["Name"])
+        if self.server.drop_posts:
+            self.close_connection = True
+            return
+        self._send(201, b'{"Id": "1"}')
+
+
+class FakeDaemon(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server recording the requests and connections it received."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str) -> None:
+        super().__init__(socket_path, FakeDaemonHandler)
+        self.connections = 0
+        self.networks = ["proxy"]
+        self.container_filters: list[dict] = []
+        self.created_networks: list[str] = []
+        self.close_after_response = False
+        self.drop_posts = False
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[FakeDaemon]:
+    server = FakeDaemon(str(tmp_path / "docker.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(daemon: FakeDaemon) -> labctl.DockerEngineClient:
+    return labctl.DockerEngineClient(daemon.server_address)
+
+
+@pytest.mark.parametrize(
+    ("docker_host", "expected"),
+    [
+        ("", "/var/run/docker.sock"),
+        ("unix:///run/user/1000/docker.sock", "/run/user/1000/docker.sock"),
+        ("tcp://192.168.1.10:2375", None),
+        ("ssh://user@host", None),
+    ],
+)
+def test_get_docker_socket(docker_host: str, expected: str | None) -> None:
+    assert labctl.get_docker_socket(docker_host) == expected
+
+
+def test_queries_share_one_connection(daemon: FakeDaemon, client: labctl.DockerEngineClient) -> None:
+    assert client.ping()
+    assert client.list_networks() == ["proxy"]
+    assert client.network_exists("proxy")
+    assert not client.network_exists("missing")
+    assert len(client.list_containers(["com.docker.compose.project"])) == 1
+    assert daemon.connections == 1
+
+
+def test_list_containers_excludes_one_off_containers(daemon: FakeDaemon, client: labctl.DockerEngineClient) -> None:
+    client.list_containers(["com.docker.compose.project=web"])
+    assert daemon.container_filters == [{"label": ["com.docker.compose.project=web", "com.docker.compose.oneoff=False"]}]
+
+
+def test_get_retried_after_connection_closed(daemon: FakeDaemon, client: labctl.DockerEngineClient) -> None:
+    daemon.close_after_response = True
+    assert client.list_networks() == ["proxy"]
+    assert client.list_networks() == ["proxy"]
+    assert daemon.connections == 2
+
+
+def test_create_network_not_retried(daemon: FakeDaemon, client: labctl.DockerEngineClient) -> None:
+    daemon.drop_posts = True
+    with pytest.raises(labctl.DockerEngineError):
+        client.create_network("backend")
+    assert daemon.created_networks == ["backend"]
+
+
+def test_create_network(daemon: FakeDaemon, client: labctl.DockerEngineClient) -> None:
+    client.create_network("backend")
+    assert daemon.created_networks == ["backend"]
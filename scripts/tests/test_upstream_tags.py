@@ -0,0 +1,138 @@
+"""Tests of the upstream tag checker against a stub registry."""
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from infra_mcp.tools.get_container_tags import ContainerTagFinder
+
+from utils.upstream_tags import UpstreamStatus, UpstreamTagChecker, split_image_reference
+
+TAGS = ["1.0.0", "1.1.0", "1.2.0", "1.2.0-alpine3.19", "1.3.0-alpine3.20", "latest", "2.0", "v3"]
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    """Registry API v2 with bearer token authentication and paginated tag lists."""
+
+    server: "StubRegistry"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _send_json(self, status: int, data: object, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.requests.append(self.path)
+        if self.path.startswith("/token"):
+            self._send_json(200, {"token": "secret"})
+        elif self.headers.get("Authorization") != "Bearer secret":
+            realm = f"http://127.0.0.1:{self.server.server_port}/token"
+            self._send_json(401, {}, {"WWW-Authenticate": f'Bearer realm="{realm}",service="stub",scope="repository:app:pull"'})
+        elif self.path == "/v2/app/tags/list":
+            self._send_json(200, {"tags": TAGS[:4]}, {"Link": '</v2/app/tags/list?last=1.2.0-alpine3.19>; rel="next"'})
+        elif self.path == "/v2/app/tags/list?last=1.2.0-alpine3.19":
+            self._send_json(200, {"tags": TAGS[4:]})
+        else:
+            self._send_json(404, {})
+
+
+class StubRegistry(ThreadingHTTPServer):
+    """Registry server recording the paths it was requested."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubRegistryHandler)
+        self.requests: list[str] = []
+
+
+@pytest.fixture
+def registry() -> Iterator[StubRegistry]:
+    server = StubRegistry()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def checker(registry: StubRegistry, monkeypatch: pytest.MonkeyPatch) -> UpstreamTagChecker:
+    checker = UpstreamTagChecker(None, jobs=2)
+    # Registries are queried over HTTPS: send the requests for the stub registry host over plain HTTP
+    registry_url = f"http://127.0.0.1:{registry.server_port}"
+    monkeypatch.setattr(checker.tag_finder, "_parse_image_reference", lambda image, registry=None: (registry_url, image.split("/", 1)[1], False))
+    return checker
+
+
+@pytest.mark.parametrize(
+    ("image", "expected"),
+    [
+        ("nginx", ("nginx", None)),
+        ("nginx:1.27", ("nginx", "1.27")),
+        ("docker.io/library/nginx:1.27", ("library/nginx", "1.27")),
+        ("registry.local:5000/app", ("registry.local:5000/app", None)),
+        ("ghcr.io/owner/app:1.2.3@sha256:abc", ("ghcr.io/owner/app", "1.2.3")),
+    ],
+)
+def test_split_image_reference(image: str, expected: tuple[str, str | None]) -> None:
+    assert split_image_reference(image) == expected
+
+
+def test_check_all(registry: StubRegistry, checker: UpstreamTagChecker) -> None:
+    host = f"127.0.0.1:{registry.server_port}"
+    statuses = checker.check_all(
+        [f"{host}/app:1.1.0", f"{host}/app:1.2.0-alpine3.19", f"{host}/app:v3", f"{host}/app:latest", f"{host}/app:${{APP_VERSION}}"]
+    )
+
+    assert statuses == {
+        f"{host}/app:1.1.0": UpstreamStatus("1.2.0", 1),
+        f"{host}/app:1.2.0-alpine3.19": UpstreamStatus("1.3.0-alpine3.20", 1),
+        f"{host}/app:v3": UpstreamStatus("v3", 0),
+        f"{host}/app:latest": UpstreamStatus(),
+        f"{host}/app:${{APP_VERSION}}": UpstreamStatus(),
+    }
+    # The tags are listed once (both pages) for all references of the repository, with one token request
+    assert sum(path.startswith("/token") for path in registry.requests) == 1
+    assert registry.requests.count("/v2/app/tags/list") == 2
+    assert registry.requests.count("/v2/app/tags/list?last=1.2.0-alpine3.19") == 1
+
+
+def test_check_all_reuses_repository_tags(registry: StubRegistry, checker: UpstreamTagChecker) -> None:
+    host = f"127.0.0.1:{registry.server_port}"
+    checker.check_all([f"{host}/app:1.0.0"])
+    requests = len(registry.requests)
+
+    assert checker.check_all([f"{host}/app:2.0"]) == {f"{host}/app:2.0": UpstreamStatus("2.0", 0)}
+    assert len(registry.requests) == requests
+
+
+@pytest.mark.parametrize(
+    ("tag", "variant", "tag_version", "sort_version"),
+    [
+        ("1.2.3", ("", 3, ""), (1, 2, 3), (1, 2, 3)),
+        ("V18", ("v", 1, ""), (18,), (18,)),
+        ("18.1-bookworm", ("", 2, "-bookworm"), (18, 1), (18, 1)),
+        ("1.2_3", ("", 2, "_#"), (1, 2), (1, 2)),
+        ("2.0.1-rc.1", ("", 3, "-rc.#"), (2, 0, 1), (2, 0, 1)),
+        # The sort key stops at the first component with a suffix
+        ("1.2.3rc1", ("", 3, "rc#"), (1, 2, 3), (1, 2)),
+        ("1.2.3b2-alpine", ("", 3, "b#-alpine"), (1, 2, 3), (1, 2)),
+        ("latest", None, None, None),
+        ("stable-1.2", None, None, None),
+    ],
+)
+def test_version_parsers(tag: str, variant: tuple | None, tag_version: tuple[int, ...] | None, sort_version: tuple[int, ...] | None) -> None:
+    finder = ContainerTagFinder()
+    assert finder._parse_version_tag(tag) == ((variant, tag_version) if variant else None)
+    assert finder._parse_version(tag) == sort_version
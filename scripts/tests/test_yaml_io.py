@@ -0,0 +1,44 @@
+"""Tests of the shared YAML I/O layer."""
+
+import math
+
+import pytest
+import yaml
+
+from utils.yaml_io import dump, safe_load, str_presenter
+
+DATA = {
+    "services": [
+        {
+            "name": "Chat 🚀 app",
+            "description": "First line\nSecond line with ümlauts\n",
+            "tags": ["ai", "😀"],
+            "port": 8080,
+            "enabled": True,
+            "icon": None,
+        }
+    ]
+}
+
+
+class PythonDumper(yaml.Dumper):
+    """Pure-Python dumper writing multiline strings in block style, as the export was written before the shared layer."""
+
+
+PythonDumper.add_representer(str, str_presenter)
+
+
+def test_dump_matches_python_emitter() -> None:
+    options = {"width": math.inf, "default_flow_style": False, "sort_keys": False, "allow_unicode": True, "indent": 2}
+    dumped = dump(DATA, **options)
+
+    assert dumped.encode() == yaml.dump(DATA, Dumper=PythonDumper, **options).encode()
+    assert "Chat 🚀 app" in dumped
+    assert "description: |\n" in dumped
+    assert safe_load(dumped) == DATA
+
+
+@pytest.mark.skipif(not hasattr(yaml, "CSafeLoader"), reason="libyaml is not available")
+def test_libyaml_loader_matches_python_loader() -> None:
+    dumped = dump(DATA, allow_unicode=True)
+    assert yaml.load(dumped, Loader=yaml.CSafeLoader) == yaml.load(dumped, Loader=yaml.SafeLoader)  # noqa: S506
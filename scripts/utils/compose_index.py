@@ -0,0 +1,105 @@
+"""Module for persisting data extracted from Docker Compose files between runs."""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+DEFAULT_INDEX_PATH = Path(".cache") / "compose-index.json"
+
+
+class ComposeIndex:
+    """Persistent on-disk index of data extracted from compose files, keyed by path, modification time and size.
+
+    Entries of unchanged files are served from the index, so a warm scan costs about a `stat` per file.
+    """
+
+    # Bump when the format of the extracted data changes, to invalidate existing index files
+    VERSION = 3
+
+    def __init__(self, index_path: Path, logger: logging.Logger | None = None) -> None:
+        """Initialize the ComposeIndex and load the index file if it exists.
+
+        Args:
+            index_path: Path to the index file
+            logger: Logger instance for logging messages. If None, creates a new logger.
+        """
+        self.index_path = index_path
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load the index file, starting with an empty index if it is missing, unreadable or outdated."""
+        try:
+            with open(self.index_path, encoding="utf-8") as stream:
+                content = json.load(stream)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable compose index {self.index_path}: {e}")
+            return
+
+        if isinstance(content, dict) and content.get("version") == self.VERSION and isinstance(content.get("files"), dict):
+            self.entries = content["files"]
+
+    def lookup(self, key: str, stat: os.stat_result) -> tuple[bool, dict | None]:
+        """Look up the extracted data of a file.
+
+        Args:
+            key: Path of the file, relative to the repository root
+            stat: Current stat result of the file
+
+        Returns:
+            Tuple of (found, data). Data may be None for files that are not valid compose files.
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.hits += 1
+            return True, entry["data"]
+
+        self.misses += 1
+        return False, None
+
+    def store(self, key: str, stat: os.stat_result, data: dict | None) -> None:
+        """Store the extracted data of a file.
+
+        Args:
+            key: Path of the file, relative to the repository root
+            stat: Stat result of the file at the time of extraction
+            data: Extracted data, or None if the file is not a valid compose file
+        """
+        self.entries[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "data": data}
+        self._dirty = True
+
+    def prune(self, prefix: str, keep: set[str]) -> None:
+        """Remove the entries below a directory that were not seen in the last scan (deleted or moved files).
+
+        Args:
+            prefix: Directory of the scan, relative to the repository root
+            keep: Keys of the files seen in the scan
+        """
+        stale = [key for key in self.entries if key.startswith(f"{prefix}/") and key not in keep]
+        for key in stale:
+            del self.entries[key]
+        self._dirty = self._dirty or bool(stale)
+
+    def save(self) -> None:
+        """Write the index file if it changed, replacing the previous one atomically."""
+        if not self._dirty:
+            return
+
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as stream:
+                json.dump({"version": self.VERSION, "files": self.entries}, stream, separators=(",", ":"))
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write compose index {self.index_path}: {e}")
+            return
+
+        self._dirty = False
@@ -1,10 +1,152 @@
 """Module for processing Docker Compose files and extracting metadata."""
 
+import io
 import logging
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 import yaml
 
+from .yaml_io import YAMLError, safe_compose_and_load
+
+# Path of keys (str) and sequence indexes (int) from the document root to a node
+KeyPath = tuple[str | int, ...]
+
+
+class ComposeDocument:
+    """A compose file read once, with its lines and parsed YAML tree computed on first use."""
+
+    def __init__(self, path: Path, text: str) -> None:
+        """Initialize the ComposeDocument.
+
+        Args:
+            path: Path to the compose file
+            text: Content of the compose file
+        """
+        self.path = path
+        self.text = text
+        # Source text of the mapping keys that are not strings once parsed, by mapping path and parsed key
+        self._key_sources: dict[tuple[KeyPath, Any], str] = {}
+
+    @classmethod
+    def read(cls, path: Path) -> "ComposeDocument":
+        """Read a compose file.
+
+        Args:
+            path: Path to the compose file
+
+        Returns:
+            The document of the file
+        """
+        return cls(path, path.read_bytes().decode("utf-8"))
+
+    @cached_property
+    def lines(self) -> list[str]:
+        """Lines of the file, with line endings normalized to "\\n" (as when reading in text mode)."""
+        return io.StringIO(self.text, newline=None).readlines()
+
+    @cached_property
+    def _parsed(self) -> tuple[yaml.Node | None, Any]:
+        """Root node and parsed YAML content of the file. Raises YAMLError if the file is not valid YAML."""
+        stream = io.StringIO(self.text)
+        stream.name = str(self.path)  # Reported in parser error messages
+        return safe_compose_and_load(stream)
+
+    @property
+    def tree(self) -> Any:
+        """Parsed YAML content of the file. Raises YAMLError if the file is not valid YAML."""
+        return self._parsed[1]
+
+    @cached_property
+    def positions(self) -> dict[KeyPath, tuple[int, int]]:
+        """Source positions of the mapping keys and sequence items of the file.
+
+        Maps key paths, e.g. ("services", "web", "ports", 0), to 1-indexed (line, column) tuples,
+        pointing at the key for mapping entries and at the item for sequence entries.
+        Keys are the source text of the mapping keys, before YAML resolves them (e.g. "yes" rather than True).
+        Raises YAMLError if the file is not valid YAML.
+        """
+        positions: dict[KeyPath, tuple[int, int]] = {}
+        root = self._parsed[0]
+        if root is not None:
+            self._collect_positions(root, (), positions, set())
+        return positions
+
+    def _collect_positions(self, node: yaml.Node, path: KeyPath, positions: dict[KeyPath, tuple[int, int]], ancestors: set[int]) -> None:
+        """Record the positions of the children of a node, recursively.
+
+        Args:
+            node: Node to walk
+            path: Key path of the node
+            positions: Positions collected so far, updated in place
+            ancestors: Ids of the nodes being walked, to stop at recursive aliases
+        """
+        if id(node) in ancestors:
+            return
+        ancestors.add(id(node))
+
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                if not isinstance(key_node, yaml.ScalarNode):
+                    continue
+                child_path = (*path, key_node.value)
+                positions[child_path] = (key_node.start_mark.line + 1, key_node.start_mark.column + 1)
+                if key_node.tag != "tag:yaml.org,2002:str":
+                    self._key_sources[path, yaml.constructor.SafeConstructor().construct_object(key_node)] = key_node.value
+                self._collect_positions(value_node, child_path, positions, ancestors)
+        elif isinstance(node, yaml.SequenceNode):
+            for index, item_node in enumerate(node.value):
+                child_path = (*path, index)
+                positions[child_path] = (item_node.start_mark.line + 1, item_node.start_mark.column + 1)
+                self._collect_positions(item_node, child_path, positions, ancestors)
+
+        ancestors.discard(id(node))
+
+    def position(self, *path: str | int) -> tuple[int, int] | None:
+        """Get the source position of a mapping key or sequence item.
+
+        Args:
+            *path: Keys and sequence indexes from the document root, e.g. "services", "web", "image"
+
+        Returns:
+            1-indexed (line, column) tuple, or None if the path does not exist
+        """
+        return self.positions.get(path)
+
+    def source_key(self, path: KeyPath, key: Any) -> str:
+        """Get the source text of a mapping key from its parsed value, e.g. "yes" for the key True of `yes:`.
+
+        Args:
+            path: Key path of the mapping (with source text keys, see positions)
+            key: Parsed key, as in the tree
+
+        Returns:
+            The key as written in the file, str(key) if it is not found
+        """
+        if not self.positions:
+            return str(key)
+        return key if isinstance(key, str) else self._key_sources.get((path, key), str(key))
+
+    @cached_property
+    def sections(self) -> tuple[list[str], list[str]]:
+        """Head comment lines (before "---", without the comment marker) and YAML content lines (after "---")."""
+        head_lines = []
+        yaml_lines = []
+        yaml_started = False
+
+        for line in self.lines:
+            if yaml_started:
+                yaml_lines.append(line)
+            elif line.strip() == "---":
+                yaml_started = True
+            elif line.startswith("# "):
+                head_lines.append(line[2:])
+            elif line.startswith("#"):
+                head_lines.append(line[1:])
+
+        return head_lines, yaml_lines
+
 
 class ComposeFileProcessor:
     """Class for processing Docker Compose files and extracting metadata."""
@@ -17,18 +159,19 @@ class ComposeFileProcessor:
         """
         self.logger = logger or logging.getLogger(__name__)
 
-    def get_compose_metadata(self, file_path: Path) -> dict[str, str] | None:
+    def get_compose_metadata(self, source: Path | ComposeDocument) -> dict[str, str] | None:
         """Extract metadata from a docker-compose file.
 
         Args:
-            file_path: Path to the docker-compose file
+            source: Path to the docker-compose file, or its already read document
 
         Returns:
             Dictionary containing name, description, icon and icon URL from homepage labels.
             Returns None if the file is not a valid compose file (no services element).
         """
+        document = self._get_document(source)
         try:
-            compose_dict = self._load_compose_file(file_path)
+            compose_dict = self._load_compose_file(document)
             if not compose_dict:
                 return None
 
@@ -37,7 +180,7 @@ class ComposeFileProcessor:
                 return None
 
             homepage_labels = self._extract_homepage_labels(services)
-            homepage_name = homepage_labels.get("name") or file_path.stem.capitalize()
+            homepage_name = homepage_labels.get("name") or document.path.stem.capitalize()
             homepage_icon = homepage_labels.get("icon", "")
 
             icon_url = f"https://cdn.jsdelivr.net/gh/homarr-labs/dashboard-icons/png/{homepage_icon}" if homepage_icon else ""
@@ -48,27 +191,37 @@ class ComposeFileProcessor:
                 "icon": homepage_icon,
                 "icon_url": icon_url,
             }
-        except yaml.YAMLError:
-            self.logger.exception(f"YAML parsing error in {file_path}")
+        except YAMLError:
+            self.logger.exception(f"YAML parsing error in {document.path}")
             return None
 
-    def _load_compose_file(self, file_path: Path) -> dict | None:
-        """Load and validate a docker-compose file.
+    def _get_document(self, source: Path | ComposeDocument) -> ComposeDocument:
+        """Return the document of a compose file, reading the file if a path is given.
+
+        Args:
+            source: Path to the docker-compose file, or its already read document
+
+        Returns:
+            The document of the compose file
+        """
+        return source if isinstance(source, ComposeDocument) else ComposeDocument.read(source)
+
+    def _load_compose_file(self, document: ComposeDocument) -> dict | None:
+        """Validate the parsed content of a docker-compose file.
 
         Args:
-            file_path: Path to the docker-compose file
+            document: Document of the docker-compose file
 
         Returns:
             Dictionary representation of the compose file, or None if invalid
         """
-        with open(file_path) as stream:
-            compose_dict = yaml.safe_load(stream)
+        compose_dict = document.tree
 
         if compose_dict is None:
             return None
 
         if not isinstance(compose_dict, dict):
-            self.logger.warning(f"Skipping {file_path}: root element is not a dictionary")
+            self.logger.warning(f"Skipping {document.path}: root element is not a dictionary")
             return None
 
         return compose_dict
@@ -101,17 +254,18 @@ class ComposeFileProcessor:
 
         return {}
 
-    def extract_image_references(self, file_path: Path) -> list[dict[str, str | int]]:
-        """Extract image references from a docker-compose file, with their line numbers.
+    def extract_image_references(self, source: Path | ComposeDocument) -> list[dict[str, str | int]]:
+        """Extract image references from a docker-compose file, with their positions.
 
         Args:
-            file_path: Path to the docker-compose file
+            source: Path to the docker-compose file, or its already read document
 
         Returns:
-            List of dicts with keys: service (name), image (reference string), line (1-indexed
-            line number in the file). Services without an "image" key are skipped.
+            List of dicts with keys: service (name), image (reference string), line and column
+            (1-indexed position of the "image" key in the file). Services without an "image" key are skipped.
         """
-        compose_dict = self._load_compose_file(file_path)
+        document = self._get_document(source)
+        compose_dict = self._load_compose_file(document)
         if not compose_dict:
             return []
 
@@ -119,11 +273,7 @@ class ComposeFileProcessor:
         if not isinstance(services, dict):
             return []
 
-        with open(file_path) as stream:
-            lines = stream.readlines()
-
         references = []
-        cursor = 0
         for service_name, service_def in services.items():
             if not isinstance(service_def, dict):
                 continue
@@ -132,38 +282,23 @@ class ComposeFileProcessor:
             if not image:
                 continue
 
-            line_number = self._find_image_line(lines, image, cursor)
-            if line_number is None:
-                self.logger.warning(f"Could not locate 'image:' line for service {service_name!r} in {file_path}")
+            # Compose reads unquoted keys such as "yes" or "1" as strings: use the key as written in the file
+            service_key = document.source_key(("services",), service_name)
+            position = document.position("services", service_key, "image")
+            if position is None:
+                self.logger.warning(f"Could not locate 'image:' line for service {service_key!r} in {document.path}")
                 continue
 
-            cursor = line_number
-            references.append({"service": service_name, "image": image, "line": line_number})
+            line, column = position
+            references.append({"service": service_key, "image": image, "line": line, "column": column})
 
         return references
 
-    def _find_image_line(self, lines: list[str], image: str, start: int) -> int | None:
-        """Find the 1-indexed line number of an "image:" line matching the given value.
-
-        Args:
-            lines: Raw lines of the compose file
-            image: Image reference string to search for
-            start: 0-indexed line to start searching from
-
-        Returns:
-            1-indexed line number if found, None otherwise
-        """
-        for index in range(start, len(lines)):
-            stripped = lines[index].strip()
-            if stripped.startswith("image:") and image in stripped:
-                return index + 1
-        return None
-
-    def extract_compose_file_data(self, source_file_path: Path) -> dict[str, dict | list] | None:
+    def extract_compose_file_data(self, source: Path | ComposeDocument) -> dict[str, dict | list] | None:
         """Extract all information from a docker-compose file.
 
         Args:
-            source_file_path: Path to the docker-compose file
+            source: Path to the docker-compose file, or its already read document
 
         Returns:
             Dictionary with keys:
@@ -172,42 +307,15 @@ class ComposeFileProcessor:
             - yaml_lines: list of YAML content lines after "---"
             Returns None if not a valid Docker Compose file.
         """
-        metadata = self.get_compose_metadata(source_file_path)
+        document = self._get_document(source)
+        metadata = self.get_compose_metadata(document)
         if metadata is None:
             return None
 
-        with open(source_file_path) as compose_file:
-            lines = compose_file.readlines()
-
-        head_lines, yaml_lines = self._parse_compose_lines(lines)
+        head_lines, yaml_lines = document.sections
 
         return {
             "metadata": metadata,
             "head_lines": head_lines,
             "yaml_lines": yaml_lines,
         }
-
-    def _parse_compose_lines(self, lines: list[str]) -> tuple[list[str], list[str]]:
-        """Parse compose file lines into head comments and YAML content.
-
-        Args:
-            lines: List of lines from the compose file
-
-        Returns:
-            Tuple of (head_lines, yaml_lines)
-        """
-        head_lines = []
-        yaml_lines = []
-        yaml_started = False
-
-        for line in lines:
-            if yaml_started:
-                yaml_lines.append(line)
-            elif line.strip() == "---":
-                yaml_started = True
-            elif line.startswith("# "):
-                head_lines.append(line[2:])
-            elif line.startswith("#"):
-                head_lines.append(line[1:])
-
-        return head_lines, yaml_lines
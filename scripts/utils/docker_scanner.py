@@ -2,24 +2,71 @@
 
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from .compose_processor import ComposeFileProcessor
+from .compose_index import ComposeIndex
+from .compose_processor import ComposeDocument, ComposeFileProcessor
+
+# Chunks per worker process: large enough to amortize the IPC cost, small enough to balance uneven files
+CHUNKS_PER_JOB = 4
+# Format of the log messages of worker processes, as used by the scripts' loggers
+WORKER_LOG_FORMAT = "  %(levelname)s: %(message)s"
+
+
+def configure_worker_logging(level: int) -> None:
+    """Configure logging in a worker process, which does not inherit the logging setup of the parent process.
+
+    Args:
+        level: Level of the messages to log, usually that of the parent process's logger
+    """
+    logging.basicConfig(level=level, format=WORKER_LOG_FORMAT, force=True)
+
+
+def extract_compose_file_data(compose_file: Path, logger: logging.Logger | None = None) -> dict | None:
+    """Extract the data of a compose file, including its image references.
+
+    Module-level so that it can be run in worker processes.
+
+    Args:
+        compose_file: Path to the compose file
+        logger: Logger instance for logging messages. If None, creates a new logger.
+
+    Returns:
+        Dictionary with metadata, head_lines, yaml_lines and image_references keys,
+        or None if not a valid Docker Compose file
+    """
+    compose_processor = ComposeFileProcessor(logger)
+    document = ComposeDocument.read(compose_file)
+    data = compose_processor.extract_compose_file_data(document)
+    if data is not None:
+        data["image_references"] = compose_processor.extract_image_references(document)
+    return data
 
 
 class DockerComposeScanner:
     """Class for scanning Docker directories and collecting compose file data."""
 
-    def __init__(self, repository_path: str | Path, logger: logging.Logger | None = None) -> None:
+    def __init__(
+        self,
+        repository_path: str | Path,
+        logger: logging.Logger | None = None,
+        index_path: str | Path | None = None,
+        jobs: int = 1,
+    ) -> None:
         """Initialize the DockerComposeScanner.
 
         Args:
             repository_path: Path to the repository root
             logger: Logger instance for logging messages. If None, creates a new logger.
+            index_path: Path to a persistent index of the extracted data (relative to the repository root),
+                to only parse new and modified compose files. If None, every file is parsed.
+            jobs: Number of worker processes parsing compose files (1: parse in this process)
         """
         self.repository_path = Path(repository_path)
         self.logger = logger or logging.getLogger(__name__)
-        self.compose_processor = ComposeFileProcessor(self.logger)
+        self.jobs = jobs
+        self.index = ComposeIndex(self.repository_path / index_path, self.logger) if index_path else None
 
     def scan_docker_directory(self, docker_path: str = "docker") -> list[dict]:
         """Scan docker directory and collect data from all compose files.
@@ -38,10 +85,11 @@ class DockerComposeScanner:
                 - metadata: dict with name, description, icon, icon_url
                 - head_lines: list of comment lines before "---"
                 - yaml_lines: list of YAML content lines after "---"
+                - image_references: list of dicts with service, image, line and column keys
                 - has_readme: bool indicating if category contains README.md
         """
         source_dir = self.repository_path / docker_path
-        services = []
+        found = []
 
         for root, dirs, files in os.walk(source_dir):
             has_readme = "README.md" in files
@@ -60,23 +108,83 @@ class DockerComposeScanner:
                 if not compose_file:
                     continue
 
-                data = self.compose_processor.extract_compose_file_data(compose_file)
-                if not data:
-                    continue
+                found.append((compose_file, category, has_readme))
+
+        all_data = self._get_compose_files_data([compose_file for compose_file, _, _ in found], docker_path)
+
+        services = []
+        for (compose_file, category, has_readme), data in zip(found, all_data, strict=True):
+            if not data:
+                continue
 
-                services.append(
-                    {
-                        "file_path": str(compose_file.relative_to(source_dir)),
-                        "category": category,
-                        "metadata": data["metadata"],
-                        "head_lines": data["head_lines"],
-                        "yaml_lines": data["yaml_lines"],
-                        "has_readme": has_readme,
-                    }
-                )
+            services.append(
+                {
+                    "file_path": str(compose_file.relative_to(source_dir)),
+                    "category": category,
+                    "metadata": data["metadata"],
+                    "head_lines": data["head_lines"],
+                    "yaml_lines": data["yaml_lines"],
+                    "image_references": data["image_references"],
+                    "has_readme": has_readme,
+                }
+            )
 
         return services
 
+    def _get_compose_files_data(self, compose_files: list[Path], docker_path: str) -> list[dict | None]:
+        """Get the data of compose files, from the index for unchanged files, parsing the others.
+
+        Args:
+            compose_files: Paths to the compose files
+            docker_path: Relative path to docker directory from repository root
+
+        Returns:
+            Data of each compose file (see extract_compose_file_data), in the order of compose_files
+        """
+        if self.index is None:
+            return self._extract_compose_files_data(compose_files)
+
+        keys = [compose_file.relative_to(self.repository_path).as_posix() for compose_file in compose_files]
+        stats = [compose_file.stat() for compose_file in compose_files]
+        all_data: list[dict | None] = [None] * len(compose_files)
+        pending = []
+
+        for position, (key, stat) in enumerate(zip(keys, stats, strict=True)):
+            found, data = self.index.lookup(key, stat)
+            if found:
+                all_data[position] = data
+            else:
+                pending.append(position)
+
+        parsed = self._extract_compose_files_data([compose_files[position] for position in pending])
+        for position, data in zip(pending, parsed, strict=True):
+            all_data[position] = data
+            self.index.store(keys[position], stats[position], data)
+
+        self.index.prune(Path(docker_path).as_posix(), set(keys))
+        self.index.save()
+        self.logger.debug(f"Compose index: {self.index.hits} files unchanged, {self.index.misses} files parsed")
+
+        return all_data
+
+    def _extract_compose_files_data(self, compose_files: list[Path]) -> list[dict | None]:
+        """Parse compose files, fanning out to worker processes when enabled.
+
+        Args:
+            compose_files: Paths to the compose files
+
+        Returns:
+            Data of each compose file (see extract_compose_file_data), in the order of compose_files
+        """
+        jobs = min(self.jobs, len(compose_files))
+        if jobs <= 1:
+            return [extract_compose_file_data(compose_file, self.logger) for compose_file in compose_files]
+
+        chunksize = max(1, len(compose_files) // (jobs * CHUNKS_PER_JOB))
+        self.logger.debug(f"Parsing {len(compose_files)} compose files in {jobs} processes (chunks of {chunksize})")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=configure_worker_logging, initargs=(self.logger.getEffectiveLevel(),)) as executor:
+            return list(executor.map(extract_compose_file_data, compose_files, chunksize=chunksize))
+
     def _find_compose_file(self, service_dir: Path, service_name: str) -> Path | None:
         """Find compose file for a service, checking both .yaml and .yml extensions.
 
@@ -1,11 +1,21 @@
 """Utility functions for Git repository operations."""
 
+import json
+import logging
+import os
+import re
 import shutil
 import subprocess
+import threading
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from pathlib import Path
 
 UNCOMMITTED_SHA = "0000000000000000000000000000000000000000"
+DEFAULT_BLAME_CACHE_PATH = Path(".cache") / "blame-cache.json"
+
+# Header line of a blamed line in `git blame --porcelain` output: <sha> <original line> <final line> [<group size>]
+_BLAME_HEADER_PATTERN = re.compile(r"^([0-9a-f]{40}) \d+ (\d+)(?: \d+)?$")
 
 
 class GitExecutableNotFoundError(RuntimeError):
@@ -43,29 +53,246 @@ def get_line_last_changed(repository_path: str | Path, file_path: str, line_numb
         Timezone-aware datetime of the commit that last changed the line, or None if the
         line is uncommitted or blame information could not be determined.
     """
+    return get_lines_last_changed(repository_path, file_path, [line_number])[line_number]
+
+
+def get_lines_last_changed(repository_path: str | Path, file_path: str, line_numbers: Iterable[int]) -> dict[int, datetime | None]:
+    """Get the dates several lines of a file were last changed, with a single `git blame` run.
+
+    Args:
+        repository_path: Path to the repository root (used as the git working directory)
+        file_path: Path to the file, relative to repository_path
+        line_numbers: 1-indexed line numbers to blame
+
+    Returns:
+        Mapping of each requested line number to the timezone-aware datetime of the commit that
+        last changed it, or None if the line is uncommitted or blame information could not be determined.
+    """
+    requested = sorted(set(line_numbers))
+    last_changed: dict[int, datetime | None] = dict.fromkeys(requested)
+    if not requested:
+        return last_changed
+
     git_cmd = _get_git_executable()
 
+    range_args = []
+    for start, end in _get_line_ranges(requested):
+        range_args.extend(["-L", f"{start},{end}"])
+
     try:
         result = subprocess.run(  # noqa: S603
-            [git_cmd, "blame", "--porcelain", "-L", f"{line_number},{line_number}", "--", file_path],
+            [git_cmd, "blame", "--porcelain", *range_args, "--", file_path],
             cwd=repository_path,
             capture_output=True,
             check=True,
             text=True,
         )
     except subprocess.CalledProcessError:
-        return None
+        return last_changed
+
+    # Commit details (e.g. author-time) are only printed for the first line blamed on each commit
+    line_shas: dict[int, str] = {}
+    commit_times: dict[str, datetime] = {}
+    sha = None
+    for line in result.stdout.splitlines():
+        if line.startswith("\t"):
+            continue
+        header = _BLAME_HEADER_PATTERN.match(line)
+        if header:
+            sha = header.group(1)
+            line_shas[int(header.group(2))] = sha
+        elif line.startswith("author-time ") and sha is not None:
+            commit_times[sha] = datetime.fromtimestamp(int(line.split(" ", 1)[1]), tz=UTC)
+
+    for line_number in requested:
+        sha = line_shas.get(line_number)
+        if sha is not None and sha != UNCOMMITTED_SHA:
+            last_changed[line_number] = commit_times.get(sha)
+
+    return last_changed
+
+
+def _get_line_ranges(line_numbers: list[int]) -> list[tuple[int, int]]:
+    """Merge sorted line numbers into ranges of consecutive lines.
+
+    Args:
+        line_numbers: Sorted, unique 1-indexed line numbers
+
+    Returns:
+        List of inclusive (start, end) ranges
+    """
+    ranges: list[tuple[int, int]] = []
+    for line_number in line_numbers:
+        if ranges and ranges[-1][1] == line_number - 1:
+            ranges[-1] = (ranges[-1][0], line_number)
+        else:
+            ranges.append((line_number, line_number))
+    return ranges
+
+
+class BlameCache:
+    """Persistent cache of line last-changed dates, keyed by file path, blob SHA and line number.
+
+    A cached date stays valid as long as the file content (its blob) is unchanged. Only files whose working
+    copy matches HEAD are cached: lines of modified or untracked files may be uncommitted (UNCOMMITTED_SHA),
+    and their dates change once committed, so these files are always blamed.
+
+    Lookups are thread-safe, the git blame runs of concurrent lookups are not serialized.
+    """
+
+    # Bump when the format of the cache file changes, to invalidate existing cache files
+    VERSION = 1
+
+    def __init__(self, repository_path: str | Path, cache_path: str | Path | None, logger: logging.Logger | None = None) -> None:
+        """Initialize the BlameCache and load the cache file if it exists.
+
+        Args:
+            repository_path: Path to the repository root (used as the git working directory)
+            cache_path: Path to the cache file, relative to repository_path. If None, every line is blamed.
+            logger: Logger instance for logging messages. If None, creates a new logger.
+        """
+        self.repository_path = Path(repository_path)
+        self.cache_path = self.repository_path / cache_path if cache_path is not None else None
+        self.logger = logger or logging.getLogger(__name__)
+        self.files: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._clean_blobs: dict[str, str] | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache file, starting with an empty cache if it is missing, unreadable or outdated."""
+        if self.cache_path is None:
+            return
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as stream:
+                content = json.load(stream)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable blame cache {self.cache_path}: {e}")
+            return
+
+        if isinstance(content, dict) and content.get("version") == self.VERSION and isinstance(content.get("files"), dict):
+            self.files = content["files"]
+
+    def _get_clean_blobs(self) -> dict[str, str]:
+        """Get the blob SHAs at HEAD of the files whose working copy is unchanged, with two git runs per cache.
+
+        Returns:
+            Mapping of file paths (relative to the repository root) to blob SHAs
+        """
+        with self._lock:
+            if self._clean_blobs is None:
+                self._clean_blobs = self._read_clean_blobs()
+            return self._clean_blobs
+
+    def _read_clean_blobs(self) -> dict[str, str]:
+        """Read the blob SHAs at HEAD of the files whose working copy is unchanged.
+
+        Returns:
+            Mapping of file paths (relative to the repository root) to blob SHAs
+        """
+        git_cmd = _get_git_executable()
+        try:
+            tree = subprocess.run(  # noqa: S603
+                [git_cmd, "ls-tree", "-r", "-z", "HEAD"],
+                cwd=self.repository_path,
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+            changed = subprocess.run(  # noqa: S603
+                [git_cmd, "diff", "--name-only", "-z", "HEAD"],
+                cwd=self.repository_path,
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError:
+            # E.g. no commits yet: nothing can be cached
+            return {}
+
+        changed_paths = set(changed.stdout.split("\0"))
+        clean_blobs = {}
+        for entry in tree.stdout.split("\0"):
+            # <mode> SP <type> SP <object> TAB <path>
+            info, _, path = entry.partition("\t")
+            fields = info.split(" ")
+            if len(fields) == 3 and fields[1] == "blob" and path not in changed_paths:
+                clean_blobs[path] = fields[2]
+        return clean_blobs
+
+    def get_lines_last_changed(self, file_path: str, line_numbers: Iterable[int]) -> dict[int, datetime | None]:
+        """Get the dates several lines of a file were last changed, blaming only the lines not cached yet.
+
+        Args:
+            file_path: Path to the file, relative to the repository root
+            line_numbers: 1-indexed line numbers to blame
+
+        Returns:
+            Mapping of each requested line number to the timezone-aware datetime of the commit that
+            last changed it, or None if the line is uncommitted or blame information could not be determined.
+        """
+        requested = set(line_numbers)
+        blob = self._get_clean_blobs().get(file_path) if self.cache_path is not None else None
+        if blob is None:
+            with self._lock:
+                self.misses += len(requested)
+            return get_lines_last_changed(self.repository_path, file_path, requested)
+
+        with self._lock:
+            entry = self.files.get(file_path)
+            if entry is None or entry["blob"] != blob:
+                entry = {"blob": blob, "lines": {}}
+                self.files[file_path] = entry
+                self._dirty = True
+
+            cached_lines = entry["lines"]
+            last_changed = {
+                line_number: datetime.fromtimestamp(cached_lines[str(line_number)], tz=UTC)
+                for line_number in requested
+                if str(line_number) in cached_lines
+            }
+            missing = requested - last_changed.keys()
+            self.hits += len(last_changed)
+            self.misses += len(missing)
+
+        if missing:
+            blamed = get_lines_last_changed(self.repository_path, file_path, missing)
+            last_changed.update(blamed)
+            with self._lock:
+                for line_number, changed in blamed.items():
+                    # Failures are not cached, to retry them on the next run
+                    if changed is not None:
+                        cached_lines[str(line_number)] = int(changed.timestamp())
+                        self._dirty = True
+
+        return last_changed
+
+    def save(self) -> None:
+        """Write the cache file if it changed, replacing the previous one atomically."""
+        if self.cache_path is None or not self._dirty:
+            return
 
-    lines = result.stdout.splitlines()
-    if not lines or lines[0].split(" ")[0] == UNCOMMITTED_SHA:
-        return None
+        # Drop the entries of files deleted (or no longer committed) since they were cached
+        clean_blobs = self._get_clean_blobs()
+        self.files = {path: entry for path, entry in self.files.items() if path in clean_blobs}
 
-    for line in lines:
-        if line.startswith("author-time "):
-            timestamp = int(line.split(" ", 1)[1])
-            return datetime.fromtimestamp(timestamp, tz=UTC)
+        temp_path = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as stream:
+                json.dump({"version": self.VERSION, "files": self.files}, stream, separators=(",", ":"))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write blame cache {self.cache_path}: {e}")
+            return
 
-    return None
+        self._dirty = False
 
 
 def get_git_root() -> str:
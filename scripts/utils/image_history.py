@@ -0,0 +1,256 @@
+"""Module for dating image lines of compose files from a single pass over the git history."""
+
+import logging
+import re
+import subprocess
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from .git_utils import UNCOMMITTED_SHA, _get_git_executable
+
+# "image:" line of a compose file, capturing the image reference
+_IMAGE_LINE_PATTERN = re.compile(r"""^\s*image:\s*["']?([^"'\s#]+)""")
+# Hunk header of a unified diff without context: @@ -<old start>[,<old count>] +<new start>[,<new count>] @@
+_HUNK_HEADER_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+# Commit line of the log output, see _COMMIT_FORMAT
+_COMMIT_MARKER = "\x00"
+_COMMIT_FORMAT = "%x00%H %at"
+
+
+@dataclass
+class ImageLine:
+    """An "image:" line of a compose file, with the commit that last changed it."""
+
+    image: str
+    commit: str
+    changed: datetime | None
+
+
+@dataclass
+class ImageChange:
+    """A change of an "image:" line in the git history (added, bumped or removed image)."""
+
+    file_path: str
+    line: int
+    commit: str
+    changed: datetime
+    old_image: str | None
+    new_image: str | None
+
+
+@dataclass
+class _Hunk:
+    """A hunk of a file diff, with the image lines it removes and adds."""
+
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    removed_images: list[str] = field(default_factory=list)
+    added_images: list[tuple[int, str]] = field(default_factory=list)
+    added_lines: int = 0
+
+
+class ImageHistoryIndex:
+    """Index of the "image:" lines of all compose files, built from a single `git log -p` run.
+
+    The diffs of the history are replayed oldest first, tracking only the image lines of each file (shifting
+    their line numbers as hunks are applied), so memory is bounded by the number of image lines. Changes in the
+    working tree are applied last, as uncommitted. Merges are diffed against their first parent, so lines
+    merged from a branch are dated by the merge commit.
+    """
+
+    def __init__(self, repository_path: str | Path, docker_path: str = "docker", logger: logging.Logger | None = None) -> None:
+        """Initialize the ImageHistoryIndex.
+
+        Args:
+            repository_path: Path to the repository root (used as the git working directory)
+            docker_path: Relative path to docker directory from repository root
+            logger: Logger instance for logging messages. If None, creates a new logger.
+        """
+        self.repository_path = Path(repository_path)
+        self.docker_path = docker_path
+        self.logger = logger or logging.getLogger(__name__)
+        self.lines: dict[str, dict[int, ImageLine]] = {}
+        self.history: list[ImageChange] = []
+
+    def build(self) -> None:
+        """Build the index from the git history and the working tree changes of the compose files."""
+        self.lines = {}
+        self.history = []
+        pathspecs = [f"{self.docker_path}/*.yaml", f"{self.docker_path}/*.yml"]
+        log_args = ["log", "--reverse", "--first-parent", "-m", "-p", "-U0", "-M", f"--format={_COMMIT_FORMAT}", "--", *pathspecs]
+
+        commit = None
+        changed = None
+        for file_diff in self._read_file_diffs(log_args):
+            if file_diff[0] is not None:
+                commit, changed = file_diff[0]
+            self._apply_file_diff(*file_diff[1:], commit=commit, changed=changed)
+
+        for file_diff in self._read_file_diffs(["diff", "-U0", "-M", "HEAD", "--", *pathspecs]):
+            self._apply_file_diff(*file_diff[1:], commit=UNCOMMITTED_SHA, changed=None)
+
+        self.logger.debug(f"Image history: {sum(len(lines) for lines in self.lines.values())} image lines, {len(self.history)} changes")
+
+    def _read_file_diffs(self, git_args: list[str]) -> Iterator[tuple[tuple[str, datetime] | None, str | None, str | None, list[_Hunk]]]:
+        """Stream the output of a git log/diff command as per-file diffs.
+
+        Args:
+            git_args: Arguments of the git command
+
+        Yields:
+            Tuples of (commit, old path, new path, hunks). Commit is a (SHA, date) tuple for the first file diff of
+            a commit, None otherwise. Paths are None for added (old) and deleted (new) files.
+        """
+        git_cmd = _get_git_executable()
+        with subprocess.Popen(  # noqa: S603
+            [git_cmd, "-c", "core.quotePath=false", *git_args],
+            cwd=self.repository_path,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        ) as process:
+            commit = None
+            old_path = new_path = None
+            hunks: list[_Hunk] | None = None
+
+            for raw_line in process.stdout:
+                line = raw_line.rstrip("\n")
+                if line.startswith(_COMMIT_MARKER) or line.startswith("diff --git "):
+                    if hunks is not None:
+                        yield commit, old_path, new_path, hunks
+                        commit = None
+                    if line.startswith(_COMMIT_MARKER):
+                        sha, _, timestamp = line[1:].partition(" ")
+                        commit = (sha, datetime.fromtimestamp(int(timestamp), tz=UTC))
+                        hunks = None
+                    else:
+                        # Paths are taken from the rename/---/+++ lines, which are unambiguous
+                        old_path = new_path = line.split(" b/", 1)[-1]
+                        hunks = []
+                elif hunks is None:
+                    continue
+                elif line.startswith("@@ "):
+                    header = _HUNK_HEADER_PATTERN.match(line)
+                    if header:
+                        old_start, old_count, new_start, new_count = header.groups()
+                        hunks.append(_Hunk(int(old_start), int(old_count or 1), int(new_start), int(new_count or 1)))
+                elif hunks:
+                    self._read_hunk_line(hunks[-1], line)
+                elif line.startswith("rename from "):
+                    old_path = line.removeprefix("rename from ")
+                elif line.startswith("rename to "):
+                    new_path = line.removeprefix("rename to ")
+                elif line.startswith("--- "):
+                    old_path = None if line == "--- /dev/null" else line.removeprefix("--- a/")
+                elif line.startswith("+++ "):
+                    new_path = None if line == "+++ /dev/null" else line.removeprefix("+++ b/")
+
+            if hunks is not None:
+                yield commit, old_path, new_path, hunks
+
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, git_args)
+
+    def _read_hunk_line(self, hunk: _Hunk, line: str) -> None:
+        """Record a removed or added line of a hunk if it is an image line.
+
+        Args:
+            hunk: Hunk the line belongs to
+            line: Line of the diff, starting with "-" or "+"
+        """
+        if line.startswith("+"):
+            line_number = hunk.new_start + hunk.added_lines
+            hunk.added_lines += 1
+            image = _IMAGE_LINE_PATTERN.match(line[1:])
+            if image:
+                hunk.added_images.append((line_number, image.group(1)))
+        elif line.startswith("-"):
+            image = _IMAGE_LINE_PATTERN.match(line[1:])
+            if image:
+                hunk.removed_images.append(image.group(1))
+
+    def _apply_file_diff(self, old_path: str | None, new_path: str | None, hunks: list[_Hunk], commit: str | None, changed: datetime | None) -> None:
+        """Apply the diff of a file to the tracked image lines.
+
+        Args:
+            old_path: Path of the file before the change, None for added files
+            new_path: Path of the file after the change, None for deleted files
+            hunks: Hunks of the diff
+            commit: SHA of the commit of the change
+            changed: Date of the commit, None for uncommitted changes
+        """
+        old_lines = self.lines.pop(old_path, {}) if old_path is not None else {}
+        if new_path is None:
+            return
+
+        new_lines = {}
+        for line_number, image_line in old_lines.items():
+            new_line_number = self._shift_line(line_number, hunks)
+            if new_line_number is not None:
+                new_lines[new_line_number] = image_line
+
+        for hunk in hunks:
+            for line_number, image in hunk.added_images:
+                new_lines[line_number] = ImageLine(image, commit or "", changed)
+
+            if changed is not None:
+                removed = hunk.removed_images
+                added = hunk.added_images
+                for index in range(max(len(removed), len(added))):
+                    old_image = removed[index] if index < len(removed) else None
+                    line_number, new_image = added[index] if index < len(added) else (hunk.new_start, None)
+                    if old_image != new_image:
+                        self.history.append(ImageChange(new_path, line_number, commit or "", changed, old_image, new_image))
+
+        self.lines[new_path] = new_lines
+
+    def _shift_line(self, line_number: int, hunks: list[_Hunk]) -> int | None:
+        """Map a line number of the old file to the new file.
+
+        Args:
+            line_number: 1-indexed line number in the old file
+            hunks: Hunks of the diff, in file order
+
+        Returns:
+            1-indexed line number in the new file, or None if the line was removed or replaced
+        """
+        shift = 0
+        for hunk in hunks:
+            if hunk.old_count and hunk.old_start <= line_number < hunk.old_start + hunk.old_count:
+                return None
+            # A hunk without removed lines inserts after its old start line
+            old_end = hunk.old_start + hunk.old_count - 1 if hunk.old_count else hunk.old_start
+            if line_number <= old_end:
+                break
+            shift += hunk.new_count - hunk.old_count
+        return line_number + shift
+
+    def get_lines_last_changed(self, file_path: str, line_numbers: Iterable[int]) -> dict[int, datetime | None]:
+        """Get the dates image lines of a compose file were last changed.
+
+        Args:
+            file_path: Path to the compose file, relative to the repository root
+            line_numbers: 1-indexed line numbers of "image:" lines
+
+        Returns:
+            Mapping of each requested line number to the timezone-aware datetime of the commit that last changed it,
+            or None if the line is uncommitted or not a tracked image line
+        """
+        file_lines = self.lines.get(file_path, {})
+        return {line_number: file_lines[line_number].changed if line_number in file_lines else None for line_number in line_numbers}
+
+    def get_image_history(self, file_path: str | None = None) -> list[ImageChange]:
+        """Get the committed changes of image lines, oldest first.
+
+        Args:
+            file_path: Only return the changes of this compose file (path as of the change). If None, all changes.
+
+        Returns:
+            List of image changes
+        """
+        return [change for change in self.history if file_path is None or change.file_path == file_path]
@@ -0,0 +1,121 @@
+"""Module for checking container image tags against the newest tags published in their registries."""
+
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_HTTP_CACHE_PATH = Path(".cache") / "http"
+# Time registry responses are reused for, in seconds
+HTTP_CACHE_TTL = 3600
+
+# Registry host aliases of Docker Hub
+_DOCKER_HUB_HOSTS = ("docker.io/", "index.docker.io/", "registry-1.docker.io/")
+
+
+@dataclass
+class UpstreamStatus:
+    """Newest compatible tag of an image in its registry."""
+
+    latest_tag: str | None = None
+    versions_behind: int | None = None
+    error: str | None = None
+
+
+def split_image_reference(image: str) -> tuple[str, str | None]:
+    """Split an image reference into its repository and tag, dropping any digest.
+
+    Args:
+        image: Image reference (e.g. "ghcr.io/owner/app:1.2.3@sha256:...")
+
+    Returns:
+        Tuple of (repository, tag). Tag is None if the reference has no tag.
+    """
+    reference = image.split("@", 1)[0]
+    repository, separator, tag = reference.rpartition(":")
+    # A colon before the last slash is the port of the registry host, not a tag separator
+    if not separator or "/" in tag:
+        repository, tag = reference, None
+
+    for host in _DOCKER_HUB_HOSTS:
+        if repository.startswith(host):
+            repository = repository.removeprefix(host)
+            break
+    return repository, tag
+
+
+class UpstreamTagChecker:
+    """Finds the newest tag of images with the same format as the tag in use (see ContainerTagFinder.get_newer_compatible_tags).
+
+    The tags of each repository are fetched once, concurrently, through a shared HTTP session. Responses are cached
+    on disk, so repeated reports do not query the registries again until the cache expires.
+    """
+
+    def __init__(self, cache_dir: Path | None, jobs: int = 8, logger: logging.Logger | None = None) -> None:
+        """Initialize the UpstreamTagChecker.
+
+        Args:
+            cache_dir: Directory of the HTTP response cache. If None, responses are only cached for this run.
+            jobs: Number of repositories queried concurrently
+            logger: Logger instance for logging messages. If None, creates a new logger.
+        """
+        # The registry client of the infra-mcp server, imported through the scripts/infra_mcp symlink to its directory
+        # (whose name is not a valid package name). Imported here, so that requests is only needed for upstream checks.
+        from infra_mcp.tools.get_container_tags import ContainerTagFinder  # noqa: PLC0415
+        from infra_mcp.utils.http import CachedSession, ResponseCache  # noqa: PLC0415
+
+        self.jobs = jobs
+        self.logger = logger or logging.getLogger(__name__)
+        # No stale-while-revalidate: background revalidations would delay the end of the run
+        self.session = CachedSession(ResponseCache(cache_dir, ttl=HTTP_CACHE_TTL, stale_ttl=0), pool_maxsize=jobs)
+        self.tag_finder = ContainerTagFinder(self.session)
+        # Tags of the repositories checked so far, reused by later check_all calls
+        self._repository_tags: dict[str, list[dict]] = {}
+
+    def _get_tag_names(self, repository: str) -> list[dict]:
+        """Get the tags of a repository, without their manifests.
+
+        Args:
+            repository: Image name without tag
+
+        Returns:
+            List of tag dictionaries, empty if the registry could not be queried
+        """
+        return self.tag_finder.get_tags(repository, sort_by="default", fetch_manifests=False)
+
+    def check_all(self, images: Iterable[str]) -> dict[str, UpstreamStatus]:
+        """Check images against the tags of their repositories.
+
+        Args:
+            images: Image references, as in compose files
+
+        Returns:
+            Mapping of each image reference to its upstream status
+        """
+        references = {image: split_image_reference(image) for image in images}
+        # References with variables (e.g. "app:${APP_VERSION}") cannot be resolved here
+        repositories = sorted({repository for repository, tag in references.values() if tag is not None and "$" not in repository + tag})
+        missing = [repository for repository in repositories if repository not in self._repository_tags]
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            self._repository_tags.update(zip(missing, executor.map(self._get_tag_names, missing), strict=True))
+        repository_tags = self._repository_tags
+
+        self.logger.debug(f"Upstream tags: {len(repositories)} repositories, HTTP cache {self.session.cache.format_stats()}")
+
+        statuses = {}
+        for image, (repository, tag) in references.items():
+            tags = repository_tags.get(repository)
+            if tag is None or tags is None:
+                statuses[image] = UpstreamStatus()
+            elif not tags:
+                statuses[image] = UpstreamStatus(error="no tags returned by the registry")
+            else:
+                newer_tags = self.tag_finder.get_newer_compatible_tags(tag, tags)
+                if newer_tags is None:
+                    # Not a version tag (e.g. "latest"): nothing to compare
+                    statuses[image] = UpstreamStatus()
+                else:
+                    statuses[image] = UpstreamStatus(newer_tags[0]["name"] if newer_tags else tag, len(newer_tags))
+        return statuses
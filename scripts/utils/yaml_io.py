@@ -0,0 +1,88 @@
+"""Module for YAML loading and dumping, parsing with the libyaml C implementation when available.
+
+Dumping always uses the pure-Python emitter: libyaml escapes characters outside the Basic
+Multilingual Plane (e.g. emoji) even with allow_unicode, which would change the exported files.
+"""
+
+from typing import IO, Any
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+
+    YAML_BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeLoader
+
+    YAML_BACKEND = "python"
+
+YAMLError = yaml.YAMLError
+
+
+def str_presenter(dumper: yaml.SafeDumper, data: str) -> yaml.ScalarNode:
+    """Configure YAML string representation to use block style for multiline strings.
+
+    Args:
+        dumper: YAML dumper instance
+        data: String data to represent
+
+    Returns:
+        YAML scalar node with appropriate style
+    """
+    if "\n" in data:
+        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
+    return dumper.represent_scalar("tag:yaml.org,2002:str", data)
+
+
+class Dumper(yaml.SafeDumper):
+    """Safe YAML dumper writing multiline strings in block style."""
+
+
+Dumper.add_representer(str, str_presenter)
+
+
+def safe_load(stream: str | bytes | IO) -> Any:
+    """Parse a YAML document, constructing only standard YAML types.
+
+    Args:
+        stream: YAML content or an open file
+
+    Returns:
+        The parsed document
+    """
+    return yaml.load(stream, Loader=SafeLoader)  # noqa: S506 - SafeLoader is yaml.CSafeLoader or yaml.SafeLoader
+
+
+def safe_compose_and_load(stream: str | bytes | IO) -> tuple[yaml.Node | None, Any]:
+    """Parse a YAML document, returning both its node graph and its content.
+
+    The nodes carry the source positions (start_mark/end_mark) of every key and value.
+    Merge keys ("<<") are already expanded in the returned nodes.
+
+    Args:
+        stream: YAML content or an open file
+
+    Returns:
+        Tuple of (root node, parsed document), both None for an empty document
+    """
+    loader = SafeLoader(stream)
+    try:
+        node = loader.get_single_node()
+        return node, loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+
+
+def dump(data: Any, stream: IO | None = None, **kwargs: Any) -> str | None:
+    """Serialize data to YAML with the safe dumper.
+
+    Args:
+        data: Data to serialize
+        stream: Open file to write to. If None, the YAML is returned as a string.
+        **kwargs: Formatting options passed to yaml.dump (e.g. width, indent, sort_keys)
+
+    Returns:
+        The YAML string if no stream was given, otherwise None
+    """
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)